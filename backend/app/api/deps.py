@@ -1,16 +1,27 @@
-from fastapi import Cookie, HTTPException, status, Depends
+from typing import Iterator, NamedTuple, Optional, Tuple
+from fastapi import Cookie, HTTPException, Query, Request, status, Depends
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.credentials import bearer_kind, bearer_token
+from app.core.database import begin_unit_of_work, get_auth_db
+from app.core.google_oauth import GoogleOAuthClient
 from app.core.security import session_manager
+from app.core.tracing import traced
+from app.core.metrics import AUTH_REQUESTS, AUTH_CACHE_REQUESTS
 from app.models.user import User
+from app.schemas.todo import parse_todo_fields
+from app.services.oauth_service import OAuthService
+from app.services.personal_token_service import PersonalTokenService
 
 
-async def get_current_user(
-    session_id: str = Cookie(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current user from session cookie"""
+class Principal(NamedTuple):
+    """The user a request acts for and the kind of credential it presented"""
+    user: User
+    kind: str  # session, personal or oauth
+
+
+def _session_user(session_id: Optional[str], db: Session) -> User:
     if not session_id:
+        AUTH_REQUESTS.labels(mode="session", outcome="failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
@@ -18,25 +29,73 @@ async def get_current_user(
     
     session_data = session_manager.get_session(session_id)
     if not session_data:
+        AUTH_CACHE_REQUESTS.labels(cache="session", result="miss").inc()
+        AUTH_REQUESTS.labels(mode="session", outcome="failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session expired or invalid"
         )
     
+    AUTH_CACHE_REQUESTS.labels(cache="session", result="hit").inc()
+    
     # Refresh session expiration
     session_manager.refresh_session(session_id)
     
     # Get user from database
     user = db.query(User).filter(User.id == session_data["user_id"]).first()
     if not user:
+        AUTH_REQUESTS.labels(mode="session", outcome="failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    AUTH_REQUESTS.labels(mode="session", outcome="success").inc()
     return user
 
 
+def _bearer_user(token: str, db: Session) -> Principal:
+    kind = bearer_kind(token)
+    user = None
+    if kind == "oauth":
+        oauth_token = OAuthService.validate_token(db, token)
+        if oauth_token and oauth_token.client.user is None:
+            AUTH_REQUESTS.labels(mode=kind, outcome="failure").inc()
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="OAuth client is not bound to a user; register a new client"
+            )
+        user = oauth_token.client.user if oauth_token else None
+    elif kind == "personal":
+        user = PersonalTokenService.get_user_for_token(db, token)
+    if not user:
+        # A token of neither shape is rejected without a query
+        AUTH_REQUESTS.labels(mode=kind or "bearer", outcome="failure").inc()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    AUTH_REQUESTS.labels(mode=kind, outcome="success").inc()
+    return Principal(user, kind)
+
+
+@traced()
+async def get_current_user(
+    session_id: str = Cookie(None),
+    db: Session = Depends(get_auth_db)
+) -> User:
+    """Get current user from session cookie.
+
+    The auth session is closed once the user is loaded, so its connection
+    goes back to the auth pool before the route runs.
+    """
+    try:
+        return _session_user(session_id, db)
+    finally:
+        db.close()
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -46,4 +105,82 @@ async def get_current_active_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+@traced()
+async def get_principal(
+    request: Request,
+    db: Session = Depends(get_auth_db)
+) -> Principal:
+    """Resolve whichever credential the request presents to its user.
+
+    A bearer token is checked against the one table its shape belongs to
+    (OAuth access token or personal token); without one the session cookie
+    is used. The result is kept on `request.state`, so resolving it again
+    in the same request costs nothing, and the auth session is closed
+    before the route runs.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    try:
+        token = bearer_token(request.headers)
+        if token:
+            principal = _bearer_user(token, db)
+        else:
+            principal = Principal(_session_user(request.cookies.get("session_id"), db), "session")
+    finally:
+        db.close()
+    if not principal.user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    request.state.principal = principal
+    return principal
+
+
+def get_todo_db(
+    request: Request,
+    principal: Principal = Depends(get_principal)
+) -> Iterator[Session]:
+    """Unit-of-work session for a todo route on the caller's traffic class pool.
+
+    Token clients use the bulk pool; browser sessions use the read pool
+    for GET and the write pool otherwise, as the old per-credential
+    routers did.
+    """
+    if principal.kind != "session":
+        traffic_class = "bulk"
+    elif request.method in ("GET", "HEAD"):
+        traffic_class = "read"
+    else:
+        traffic_class = "write"
+    unit_of_work = begin_unit_of_work(request, traffic_class)
+    try:
+        yield unit_of_work.session
+    finally:
+        unit_of_work.close()
+
+
+def get_todo_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated todo fields to return, e.g. id,title,completed; "
+        "other fields are left out of each todo in the response"
+    )
+) -> Tuple[str, ...]:
+    """Sparse fieldset requested with `?fields=`"""
+    try:
+        return parse_todo_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def get_google_client(request: Request) -> GoogleOAuthClient:
+    """The pooled Google OAuth client created in the app lifespan"""
+    return request.app.state.google_client
@@ -1,22 +0,0 @@
-from fastapi import HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.services.oauth_service import OAuthService
-
-security = HTTPBearer()
-
-
-async def get_oauth_client(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    """Validate OAuth token and get client"""
-    token = OAuthService.validate_token(db, credentials.credentials)
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return token.client
\ No newline at end of file
@@ -1,28 +1,36 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_auth_db
+from app.core.tracing import traced
+from app.core.metrics import AUTH_REQUESTS
 from app.models.user import User
 from app.api.v1.personal_tokens import validate_personal_token
 
 security = HTTPBearer()
 
 
+@traced()
 async def get_user_from_personal_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_auth_db)
 ) -> User:
-    """Validate personal token and get user"""
+    """Validate personal token and get user; releases the auth connection before returning"""
     
     # Remove "Bearer " prefix if present
     token = credentials.credentials
     
-    user = validate_personal_token(token, db)
+    try:
+        user = validate_personal_token(token, db)
+    finally:
+        db.close()
     if not user:
+        AUTH_REQUESTS.labels(mode="personal", outcome="failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
\ No newline at end of file
+    AUTH_REQUESTS.labels(mode="personal", outcome="success").inc()
+    return user
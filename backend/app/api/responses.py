@@ -0,0 +1,18 @@
+import orjson
+from typing import Any
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """orjson response that writes UTC datetimes with a `Z` suffix.
+
+    pydantic serializes aware UTC datetimes as `...Z` while plain orjson
+    writes `...+00:00`; OPT_UTC_Z keeps handlers that return rows directly
+    byte-compatible with the response_model path.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -0,0 +1,32 @@
+from typing import Any, Callable, Coroutine
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Route that ends the request's unit of work as soon as the handler returns.
+
+    Dependency cleanup only runs after the response has been sent, so the
+    commit happens here instead: a failed commit becomes an error response
+    rather than following a 200, and the connection is back in its pool
+    before the body is written to the client. A handler that raises has
+    its work rolled back.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except BaseException:
+                unit_of_work = getattr(request.state, "unit_of_work", None)
+                if unit_of_work is not None:
+                    unit_of_work.close()
+                raise
+            unit_of_work = getattr(request.state, "unit_of_work", None)
+            if unit_of_work is not None:
+                unit_of_work.complete()
+            return response
+
+        return route_handler
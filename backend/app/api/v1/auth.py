@@ -6,9 +6,11 @@ from app.core.database import get_db
 from app.core.config import settings
 from app.services.auth_service import AuthService
 from app.schemas.user import UserResponse
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_google_client
+from app.api.routing import UnitOfWorkRoute
+from app.core.google_oauth import GoogleOAuthClient
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.get("/google/login")
@@ -22,22 +24,16 @@ async def google_login():
 async def google_callback(
     code: str,
     response: Response,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    google: GoogleOAuthClient = Depends(get_google_client)
 ):
     """Handle Google OAuth callback"""
     try:
         # Exchange code for tokens
-        tokens = await AuthService.exchange_code_for_tokens(code)
-        access_token = tokens.get("access_token")
+        tokens = await AuthService.exchange_code_for_tokens(google, code)
         
-        if not access_token:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to obtain access token"
-            )
-        
-        # Get user information
-        user_info = await AuthService.get_user_info(access_token)
+        # Get user information from the verified ID token
+        user_info = await AuthService.get_user_info(google, tokens)
         
         # Create or update user in database
         user = AuthService.create_or_update_user(db, user_info)
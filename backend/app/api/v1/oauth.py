@@ -2,13 +2,16 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
 from typing import Dict, Any
-from app.core.database import get_db
+from app.core.database import get_bulk_db
 from app.core.config import settings
+from app.api.personal_deps import get_user_from_personal_token
+from app.api.routing import UnitOfWorkRoute
+from app.models.user import User
 from app.services.oauth_service import OAuthService
 from pydantic import BaseModel
 import json
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 security = HTTPBasic()
 
 
@@ -28,7 +31,7 @@ class TokenResponse(BaseModel):
 async def create_token(
     token_request: TokenRequest,
     credentials: HTTPBasicCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_bulk_db)
 ):
     """OAuth 2.0 token endpoint"""
     # Validate grant type
@@ -67,7 +70,7 @@ async def create_token(
     return TokenResponse(
         access_token=token.access_token,
         token_type=token.token_type,
-        expires_in=settings.oauth_token_expire_seconds,
+        expires_in=OAuthService.get_expires_in(token),
         scope=" ".join(requested_scopes)
     )
 
@@ -76,11 +79,12 @@ async def create_token(
 async def create_client(
     client_name: str,
     scopes: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_bulk_db),
+    user: User = Depends(get_user_from_personal_token)
 ):
-    """Create a new OAuth client (for development/setup)"""
+    """Create a new OAuth client acting for the personal token's user (for development/setup)"""
     scope_list = scopes.split() if scopes else ["todos:read", "todos:write"]
-    client = OAuthService.create_client(db, client_name, scope_list)
+    client = OAuthService.create_client(db, client_name, scope_list, user)
     
     return {
         "client_id": client.client_id,
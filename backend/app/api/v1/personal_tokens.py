@@ -6,10 +6,11 @@ from app.core.database import get_db
 from app.models.user import User
 from app.models.personal_token import PersonalToken
 from app.api.deps import get_current_user
+from app.api.routing import UnitOfWorkRoute
 from app.services.personal_token_service import PersonalTokenService
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 class PersonalTokenCreate(BaseModel):
@@ -31,18 +32,12 @@ class PersonalTokenInfo(BaseModel):
     expires_at: datetime
     created_at: datetime
     last_used_at: Optional[datetime] = None
+    request_count: int = 0
 
 
 def validate_personal_token(token: str, db: Session) -> Optional[User]:
     """Validate a personal token and return the associated user"""
-    token_obj = PersonalTokenService.validate_token(db, token)
-    
-    if not token_obj:
-        return None
-    
-    # Get user
-    user = db.query(User).filter(User.id == token_obj.user_id).first()
-    return user
+    return PersonalTokenService.get_user_for_token(db, token)
 
 
 @router.post("/tokens", response_model=PersonalTokenResponse)
@@ -87,7 +82,8 @@ async def list_tokens(
             name=token.name,
             expires_at=token.expires_at,
             created_at=token.created_at,
-            last_used_at=token.last_used_at
+            last_used_at=token.last_used_at,
+            request_count=token.request_count
         )
         for token in tokens
     ]
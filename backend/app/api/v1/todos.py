@@ -1,77 +1,81 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from typing import List, Tuple
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.api.deps import get_current_active_user
-from app.models.user import User
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse
+from app.api.deps import Principal, get_principal, get_todo_db, get_todo_fields
+from app.api.responses import ORJSONResponse
+from app.api.routing import UnitOfWorkRoute
+from app.schemas.todo import (
+    SparseTodoResponse, TodoCreate, TodoUpdate, TodoResponse, serialize_todos, todo_to_dict
+)
 from app.services.todo_service import TodoService
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
-@router.get("/", response_model=List[TodoResponse])
+@router.get("/", response_model=List[SparseTodoResponse])
 async def get_todos(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_todo_db),
+    fields: Tuple[str, ...] = Depends(get_todo_fields),
+    principal: Principal = Depends(get_principal)
 ):
-    """Get all todos for the current user"""
-    todos = TodoService.get_todos(db, current_user)
-    return [TodoResponse.from_orm(todo) for todo in todos]
+    """Get all todos for the authenticated user"""
+    todos = TodoService.list_todos(db, principal.user, fields)
+    return ORJSONResponse(serialize_todos(todos, fields=fields))
 
 
 @router.post("/", response_model=TodoResponse)
 async def create_todo(
     todo: TodoCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_todo_db),
+    principal: Principal = Depends(get_principal)
 ):
     """Create a new todo"""
-    new_todo = TodoService.create_todo(db, todo, current_user)
-    return TodoResponse.from_orm(new_todo)
+    new_todo = TodoService.create_todo(db, todo, principal.user)
+    return ORJSONResponse(todo_to_dict(new_todo))
 
 
-@router.get("/{todo_id}", response_model=TodoResponse)
+@router.get("/{todo_id}", response_model=SparseTodoResponse)
 async def get_todo(
     todo_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_todo_db),
+    fields: Tuple[str, ...] = Depends(get_todo_fields),
+    principal: Principal = Depends(get_principal)
 ):
     """Get a specific todo by ID"""
-    todo = TodoService.get_todo_by_id(db, todo_id, current_user)
+    todo = TodoService.get_todo_row(db, todo_id, principal.user, fields)
     if not todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
-    return TodoResponse.from_orm(todo)
+    return ORJSONResponse(todo_to_dict(todo, fields))
 
 
 @router.put("/{todo_id}", response_model=TodoResponse)
 async def update_todo(
     todo_id: str,
     todo_update: TodoUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_todo_db),
+    principal: Principal = Depends(get_principal)
 ):
     """Update an existing todo"""
-    updated_todo = TodoService.update_todo(db, todo_id, todo_update, current_user)
+    updated_todo = TodoService.update_todo(db, todo_id, todo_update, principal.user)
     if not updated_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
-    return TodoResponse.from_orm(updated_todo)
+    return ORJSONResponse(todo_to_dict(updated_todo))
 
 
 @router.delete("/{todo_id}")
 async def delete_todo(
     todo_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_todo_db),
+    principal: Principal = Depends(get_principal)
 ):
     """Delete a todo"""
-    success = TodoService.delete_todo(db, todo_id, current_user)
+    success = TodoService.delete_todo(db, todo_id, principal.user)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
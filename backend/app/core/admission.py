@@ -0,0 +1,248 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Dict, List, Optional
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.credentials import bearer_token
+from app.core.database import pool_capacity
+from app.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_REJECTIONS,
+)
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Browser-facing routes; everything else under /api/ is MCP or bulk traffic
+INTERACTIVE_PREFIXES = (
+    "/api/v1/todos",
+    "/api/v1/oauth-todos",
+    "/api/v1/personal-todos",
+    "/api/v1/auth",
+    "/api/v1/personal-tokens",
+)
+
+
+def request_priority(scope: Scope) -> Optional[int]:
+    """Priority class of a request, or None when it bypasses admission.
+
+    Bearer tokens are MCP and script traffic whichever todo prefix they use.
+    """
+    path = scope["path"]
+    if not path.startswith("/api/"):
+        return None
+    if bearer_token(Headers(scope=scope)):
+        return BULK
+    return INTERACTIVE if path.startswith(INTERACTIVE_PREFIXES) else BULK
+
+
+class AdmissionController:
+    """Adaptive concurrency limit with a short priority queue.
+
+    The limit follows AIMD on measured service time while it is binding: it
+    grows by about one per limit's worth of requests completing under
+    `latency_target` and shrinks by `backoff` (at most once per target
+    interval) when a request takes longer. A fraction of the limit is
+    reserved for interactive requests, queued interactive requests are
+    admitted first, and a full queue sheds its newest bulk waiter to make
+    room for an interactive one.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: int,
+        max_limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        latency_target: float,
+        interactive_reserve: float = 0.2,
+        backoff: float = 0.9,
+        class_limits: Optional[Dict[int, int]] = None
+    ):
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.interactive_reserve = interactive_reserve
+        self.backoff = backoff
+        self.class_limits = class_limits or {}
+        self.in_flight = 0
+        self.class_in_flight = {INTERACTIVE: 0, BULK: 0}
+        self._waiters: List[list] = []  # heap of [priority, seq, future]
+        self._queued = 0
+        self.class_queued = {INTERACTIVE: 0, BULK: 0}
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+        ADMISSION_LIMIT.set(self.limit)
+
+    def _capacity(self, priority: int) -> int:
+        limit = max(self.min_limit, math.floor(self.limit))
+        if priority == INTERACTIVE or limit < 2:
+            return limit
+        return limit - max(1, math.floor(limit * self.interactive_reserve))
+
+    def _can_admit(self, priority: int) -> bool:
+        if priority in self.class_limits and self.class_in_flight[priority] >= self.class_limits[priority]:
+            return False
+        return self.in_flight < self._capacity(priority)
+
+    def _must_queue(self, priority: int) -> bool:
+        """Queue behind waiters of equal or higher priority, or when no slot is free.
+
+        Lower-priority waiters never hold up a request, so bulk requests
+        stuck at the bulk class limit don't block interactive admission.
+        """
+        if any(self.class_queued[waiting] for waiting in self.class_queued if waiting <= priority):
+            return True
+        return not self._can_admit(priority)
+
+    def _dequeue(self, priority: int) -> None:
+        self._queued -= 1
+        self.class_queued[priority] -= 1
+
+    def _admit(self, priority: int) -> None:
+        self.in_flight += 1
+        self.class_in_flight[priority] += 1
+        ADMISSION_IN_FLIGHT.inc()
+
+    def _shed_bulk_waiter(self) -> bool:
+        """Reject the newest queued bulk request, if any"""
+        bulk = [entry for entry in self._waiters if entry[0] == BULK and not entry[2].done()]
+        if not bulk:
+            return False
+        newest = max(bulk, key=lambda entry: entry[1])
+        newest[2].set_result(False)
+        self._dequeue(BULK)
+        return True
+
+    async def acquire(self, priority: int) -> Optional[str]:
+        """Wait for a slot; returns None when admitted or the rejection reason"""
+        if not self._must_queue(priority):
+            self._admit(priority)
+            return None
+
+        if self._queued >= self.queue_size:
+            if priority != INTERACTIVE or not self._shed_bulk_waiter():
+                return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), future])
+        self._queued += 1
+        self.class_queued[priority] += 1
+        start = time.perf_counter()
+        try:
+            admitted = await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            # Admission may have landed just as the wait expired
+            admitted = self._abandon(future, priority)
+            if not admitted:
+                return "timeout"
+        except asyncio.CancelledError:
+            if self._abandon(future, priority):
+                self._release_slot(priority)
+            raise
+        finally:
+            ADMISSION_QUEUE_WAIT.labels(priority=PRIORITY_NAMES[priority]).observe(time.perf_counter() - start)
+        return None if admitted else "shed"
+
+    def _abandon(self, future: asyncio.Future, priority: int) -> bool:
+        """Leave the queue; returns True if a slot was granted meanwhile"""
+        if future.done():
+            return future.result()
+        future.set_result(False)
+        self._dequeue(priority)
+        return False
+
+    def _release_slot(self, priority: int) -> None:
+        self.in_flight -= 1
+        self.class_in_flight[priority] -= 1
+        ADMISSION_IN_FLIGHT.dec()
+        self._wake()
+
+    def release(self, priority: int, latency: float) -> None:
+        """Free a slot and adapt the limit to the request's service time"""
+        # Only a binding limit says anything about capacity; a slow request
+        # on an idle server is just a slow request
+        if self._queued > 0 or self.in_flight >= math.floor(self.limit):
+            now = time.monotonic()
+            if latency > self.latency_target:
+                if now - self._last_decrease >= self.latency_target:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            ADMISSION_LIMIT.set(self.limit)
+        self._release_slot(priority)
+
+    def _wake(self) -> None:
+        # Interactive waiters sort first; once the head can't be admitted,
+        # nothing behind it can be either (bulk capacity is never larger)
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_admit(priority):
+                return
+            heapq.heappop(self._waiters)
+            self._dequeue(priority)
+            self._admit(priority)
+            future.set_result(True)
+
+
+def create_admission_controller() -> AdmissionController:
+    """Controller sized to the pools: interactive requests use the read and
+    write pools, bulk requests the bulk pool, so neither queues on checkout"""
+    max_limit = settings.admission_max_limit or min(pool_capacity("read"), pool_capacity("write"))
+    return AdmissionController(
+        initial_limit=settings.admission_initial_limit,
+        min_limit=min(settings.admission_min_limit, max_limit),
+        max_limit=max_limit,
+        queue_size=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout_ms / 1000,
+        latency_target=settings.admission_latency_target_ms / 1000,
+        interactive_reserve=settings.admission_interactive_reserve,
+        class_limits={BULK: pool_capacity("bulk")}
+    )
+
+
+class AdmissionMiddleware:
+    """Bound concurrent API requests and answer 503 quickly once saturated"""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        priority = request_priority(scope) if scope["type"] == "http" else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await self.controller.acquire(priority)
+        if rejected:
+            ADMISSION_REJECTIONS.labels(priority=PRIORITY_NAMES[priority], reason=rejected).inc()
+            response = JSONResponse(
+                {"detail": "Server busy, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(priority, time.perf_counter() - start)
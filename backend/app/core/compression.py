@@ -0,0 +1,255 @@
+import hashlib
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import COMPRESSION_BYTES, COMPRESSION_CACHE_REQUESTS, COMPRESSION_CPU_SECONDS
+
+# Server preference when the client rates encodings equally
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# Bodies above this are compressed in a worker thread to keep the loop free
+OFFLOAD_SIZE = 256 * 1024
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    qualities = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Best supported encoding for an Accept-Encoding header, or None"""
+    qualities = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(("+json", "+xml"))
+
+
+class StreamCompressor:
+    """Incremental gzip or brotli encoder that records its CPU time"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk, flushing so each chunk reaches the client promptly"""
+        start = time.thread_time()
+        if self.encoding == "br":
+            output = self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        else:
+            output = self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        COMPRESSION_CPU_SECONDS.labels(encoding=self.encoding).inc(time.thread_time() - start)
+        COMPRESSION_BYTES.labels(encoding=self.encoding, stage="in").inc(len(data))
+        COMPRESSION_BYTES.labels(encoding=self.encoding, stage="out").inc(len(output))
+        return output
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by encoding and ETag or body digest"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """Negotiate gzip or brotli and compress responses.
+
+    Complete bodies under `minimum_size` are sent as-is. Every response
+    with a compressible type carries `Vary: Accept-Encoding`, encoded or
+    not, so shared caches keep the variants apart. Streamed responses
+    are compressed chunk by chunk. Compressed complete bodies are kept in an
+    LRU keyed by ETag or body digest, so a response served from a cache is
+    compressed once rather than on every hit. ETags are only unique per
+    resource, so ETag keys also carry the path, query and content type.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.compression_minimum_size,
+        gzip_level: int = settings.compression_gzip_level,
+        brotli_quality: int = settings.compression_brotli_quality,
+        cache_entries: int = settings.compression_cache_entries,
+        cache_max_body: int = settings.compression_cache_max_body
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = CompressedCache(cache_entries) if cache_entries else None
+        self.cache_max_body = cache_max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, _CompressionResponder(self, encoding, scope, send).send)
+
+    def compressor(self, encoding: str) -> StreamCompressor:
+        return StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+
+    async def compress_body(
+        self,
+        encoding: str,
+        body: bytes,
+        etag: Optional[str],
+        resource: Tuple[str, bytes, str] = ("", b"", "")
+    ) -> bytes:
+        """Compress a complete body, reusing a cached variant when possible.
+
+        `resource` is the (path, query string, content type) an ETag belongs to.
+        """
+        key = None
+        if self.cache is not None and len(body) <= self.cache_max_body:
+            if etag:
+                key = (encoding, etag.encode(), *resource)
+            else:
+                key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            cached = self.cache.get(key)
+            COMPRESSION_CACHE_REQUESTS.labels(result="hit" if cached is not None else "miss").inc()
+            if cached is not None:
+                return cached
+
+        compressor = self.compressor(encoding)
+        if len(body) > OFFLOAD_SIZE:
+            compressed = await anyio.to_thread.run_sync(compressor.compress, body, True)
+        else:
+            compressed = compressor.compress(body, True)
+
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], scope: Scope, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.scope = scope
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.mode: Optional[str] = None  # "identity" or "stream" once decided
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            if is_compressible(headers.get("content-type", "")):
+                headers.add_vary_header("Accept-Encoding")
+            if self.encoding is None:
+                self.mode = "identity"
+                await self._send(message)
+                return
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.mode == "identity":
+            await self._send(message)
+            return
+        if self.mode == "stream":
+            final = not message.get("more_body", False)
+            body = self.compressor.compress(message.get("body", b""), final)
+            await self._send({"type": "http.response.body", "body": body, "more_body": not final})
+            return
+
+        await self._first_body(message)
+
+    def _should_compress(self, headers: MutableHeaders) -> bool:
+        status = self.start_message["status"]
+        return (
+            status not in (204, 304)
+            and "content-encoding" not in headers
+            and "content-range" not in headers
+            and is_compressible(headers.get("content-type", ""))
+        )
+
+    async def _first_body(self, message: Message) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self._should_compress(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            self.mode = "identity"
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The encoded body differs byte for byte, so the validator weakens
+            headers["etag"] = f"W/{etag}"
+        headers["content-encoding"] = self.encoding
+
+        if more_body:
+            self.mode = "stream"
+            self.compressor = self.middleware.compressor(self.encoding)
+            del headers["content-length"]
+            await self._send(self.start_message)
+            await self._send({
+                "type": "http.response.body",
+                "body": self.compressor.compress(body, False),
+                "more_body": True,
+            })
+            return
+
+        resource = (self.scope["path"], self.scope.get("query_string", b""), headers.get("content-type", ""))
+        compressed = await self.middleware.compress_body(self.encoding, body, etag, resource)
+        headers["content-length"] = str(len(compressed))
+        self.mode = "identity"
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": compressed})
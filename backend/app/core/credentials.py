@@ -0,0 +1,89 @@
+import base64
+import hashlib
+from http.cookies import SimpleCookie
+from typing import Optional
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+# Issued tokens are secrets.token_urlsafe(32) for OAuth access tokens and
+# token_urlsafe(64) for personal tokens, so their length tells them apart
+BEARER_KINDS = {43: "oauth", 86: "personal"}
+
+
+def _digest(secret: str) -> str:
+    """Stable short digest so raw credentials never end up in Redis keys"""
+    return hashlib.sha256(secret.encode()).hexdigest()[:32]
+
+
+def _basic_username(value: str) -> Optional[str]:
+    try:
+        decoded = base64.b64decode(value, validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    username, _, _ = decoded.partition(":")
+    return username or None
+
+
+def oauth_token_client_key(token: str) -> str:
+    """Redis key that maps an OAuth access token to its client_id"""
+    return f"oauth_token_client:{_digest(token)}"
+
+
+def client_address(scope: Scope) -> str:
+    """`ip:<address>` of the peer, or `anonymous` when the server gives none"""
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
+
+
+def bearer_kind(token: str) -> Optional[str]:
+    """Kind of a bearer token by its shape: oauth, personal, or None if we never issue it"""
+    return BEARER_KINDS.get(len(token))
+
+
+def bearer_token(headers: Headers) -> Optional[str]:
+    """The token in an `Authorization: Bearer` header, if any"""
+    scheme, _, value = headers.get("authorization", "").partition(" ")
+    value = value.strip()
+    return value if scheme.lower() == "bearer" and value else None
+
+
+def _session_id(headers: Headers) -> Optional[str]:
+    cookie_header = headers.get("cookie")
+    if not cookie_header:
+        return None
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header)
+    except Exception:
+        return None
+    morsel = cookie.get("session_id")
+    return morsel.value if morsel else None
+
+
+def credential_identity(scope: Scope) -> str:
+    """Identify the credential a request presents without touching the database.
+
+    Returns `personal:<digest>` or `oauth:<digest>` for bearer tokens
+    (`bearer:<digest>` when the shape matches neither),
+    `oauth_client:<client_id>` for client credentials on the token
+    endpoint, `session:<digest>` for session cookies and `ip:<address>`
+    for anonymous requests. A client holds one OAuth token per scope set,
+    so rate limiting maps OAuth token identities to their client.
+    """
+    headers = Headers(scope=scope)
+    token = bearer_token(headers)
+    if token:
+        return f"{bearer_kind(token) or 'bearer'}:{_digest(token)}"
+
+    scheme, _, value = headers.get("authorization", "").partition(" ")
+    value = value.strip()
+    if scheme.lower() == "basic" and value:
+        client_id = _basic_username(value)
+        if client_id:
+            return f"oauth_client:{client_id}"
+
+    session_id = _session_id(headers)
+    if session_id:
+        return f"session:{_digest(session_id)}"
+
+    return client_address(scope)
@@ -1,22 +1,229 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from sqlalchemy import create_engine, delete, event, inspect, select, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import ORMExecuteState, sessionmaker, Session
+from starlette.requests import Request
+from sqlalchemy.schema import AddConstraint, CreateColumn
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedQueuePool, instrument_engine
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.database_url)
+# Bulkheads: each traffic class gets its own pool, checkout timeout and
+# statement timeout, so exhausting one (say, bulk MCP traffic) never takes
+# the connections another (auth lookups) needs
+TRAFFIC_CLASSES = ("auth", "read", "write", "bulk")
+
+
+def _create_engine(traffic_class: str):
+    pool_engine = create_engine(
+        settings.database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=getattr(settings, f"db_{traffic_class}_pool_size"),
+        max_overflow=getattr(settings, f"db_{traffic_class}_max_overflow"),
+        pool_timeout=getattr(settings, f"db_{traffic_class}_pool_timeout"),
+        connect_args={
+            "options": f"-c statement_timeout={getattr(settings, f'db_{traffic_class}_statement_timeout_ms')}"
+        }
+    )
+    instrument_engine(pool_engine, traffic_class)
+    return pool_engine
+
+
+engines = {traffic_class: _create_engine(traffic_class) for traffic_class in TRAFFIC_CLASSES}
+
+# Default engine for unclassified work: startup DDL, scheduled jobs, scripts
+engine = engines["write"]
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Auth sessions are closed as soon as the principal is loaded, so loaded
+# objects must stay usable after commit
+session_factories = {
+    traffic_class: sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=traffic_class != "auth",
+        bind=pool_engine
+    )
+    for traffic_class, pool_engine in engines.items()
+}
+
 # Create Base class for models
 Base = declarative_base()
 
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+def pool_capacity(traffic_class: str) -> int:
+    pool = engines[traffic_class].pool
+    return pool.size() + pool._max_overflow
+
+
+def _mark_flush_writes(session: Session, flush_context) -> None:
+    session.info["writes"] = True
+
+
+def _mark_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["writes"] = True
+
+
+for session_factory in session_factories.values():
+    event.listen(session_factory, "after_flush", _mark_flush_writes)
+    event.listen(session_factory, "do_orm_execute", _mark_statement_writes)
+
+
+class UnitOfWork:
+    """A request's session and the one commit that ends it.
+
+    The session checks out a connection on its first statement. Services
+    flush their changes instead of committing; `complete` commits once if
+    anything was written (reads just roll back) and returns the
+    connection to the pool, while `close` discards the work.
+    """
+
+    def __init__(self, traffic_class: str):
+        self.traffic_class = traffic_class
+        self.session = session_factories[traffic_class]()
+
+    def complete(self) -> None:
+        try:
+            self.session.flush()
+            if self.session.info.get("writes"):
+                self.session.commit()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.session.close()
+        self.session.info.pop("writes", None)
+
+
+def begin_unit_of_work(request: Request, traffic_class: str) -> UnitOfWork:
+    """The request's unit of work, started on the traffic class's pool by its first user"""
+    unit_of_work = getattr(request.state, "unit_of_work", None)
+    if unit_of_work is None:
+        unit_of_work = UnitOfWork(traffic_class)
+        request.state.unit_of_work = unit_of_work
+    return unit_of_work
+
+
+def session_dependency(traffic_class: str):
+    """FastAPI dependency yielding the request's unit-of-work session.
+
+    Routes must use `UnitOfWorkRoute`, which commits when the handler
+    returns; cleanup here runs only after the response has been sent and
+    merely discards whatever is left.
+    """
+
+    def get_session(request: Request):
+        unit_of_work = begin_unit_of_work(request, traffic_class)
+        try:
+            yield unit_of_work.session
+        finally:
+            unit_of_work.close()
+
+    get_session.__name__ = f"get_{traffic_class}_db"
+    return get_session
+
+
+def get_auth_db():
+    """Session on the auth pool, outside the unit of work; closed by the auth dependency"""
+    db = session_factories["auth"]()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+get_read_db = session_dependency("read")
+get_write_db = session_dependency("write")
+get_bulk_db = session_dependency("bulk")
+
+# Dependency to get DB session
+get_db = get_write_db
+
+
+def sync_schema(bind=engine) -> None:
+    """Add columns and indexes declared on models but missing from existing tables.
+
+    `create_all` only creates tables that do not exist yet, so additive model
+    changes (new nullable/defaulted columns with their foreign keys, new
+    indexes) are applied here.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        # Index builds on large tables may outlast the pool's statement timeout
+        conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {ddl}")
+                    for foreign_key in column.foreign_keys:
+                        conn.execute(AddConstraint(foreign_key.constraint))
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+# Application-wide pg_advisory_lock key serializing schema changes
+SCHEMA_LOCK_ID = 0x79617461
+
+
+def init_schema(bind=engine) -> None:
+    """Create missing tables and apply `sync_schema`, one process at a time.
+
+    Processes starting together would otherwise race on the same DDL and
+    fail with duplicate objects. Each waits on an advisory lock held for
+    the whole run, so the first does the work and the rest find nothing
+    left to do.
+    """
+    import app.models  # noqa: F401  registers every table on Base.metadata
+
+    with bind.begin() as lock_conn:
+        # The holder may be building an index on a large table
+        lock_conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+        lock_conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_ID})
+        Base.metadata.create_all(bind=bind)
+        sync_schema(bind)
+
+
+def delete_in_batches(db: Session, model, *criteria, batch_size: int = 1000) -> int:
+    """Delete rows matching criteria in bounded batches and return the total count.
+
+    Each batch is its own short transaction so the reaper never holds locks on
+    large ranges, and rows locked by concurrent requests are skipped.
+    """
+    total = 0
+    while True:
+        batch = (
+            select(model.id)
+            .where(*criteria)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = db.execute(
+            delete(model)
+            .where(model.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+def warm_pool(bind=engine, connections: Optional[int] = None) -> int:
+    """Open pool connections up front so early requests don't pay for connecting"""
+    count = bind.pool.size() if connections is None else connections
+    opened = []
+    try:
+        for _ in range(count):
+            conn = bind.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
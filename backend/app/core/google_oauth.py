@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+import httpx
+from jose import jwt
+from jose.exceptions import JOSEError
+from app.core.config import settings
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class InvalidIdToken(Exception):
+    """The id_token is malformed, expired, or not signed by Google for us"""
+
+
+class GoogleOAuthClient:
+    """Code exchange and ID-token verification over one pooled HTTP/2 client.
+
+    Google's signing keys are cached for the lifetime its JWKS response
+    advertises. A token signed with an unknown key id triggers a refetch,
+    at most once per `jwks_min_refresh_seconds`, so rotated keys are picked
+    up without letting forged key ids hammer Google.
+    """
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str,
+        jwks_min_refresh_seconds: float = 60,
+        clock_skew_seconds: int = 60
+    ):
+        self.http = http
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.jwks_min_refresh_seconds = jwks_min_refresh_seconds
+        self.clock_skew_seconds = clock_skew_seconds
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._keys_expire_at = 0.0
+        self._last_fetch = 0.0
+        self._refresh_lock = asyncio.Lock()
+
+    @traced("GoogleOAuthClient.exchange_code")
+    async def exchange_code(self, code: str) -> Dict[str, Any]:
+        """Exchange an authorization code for Google's token response"""
+        response = await self.http.post(
+            GOOGLE_TOKEN_URL,
+            data={
+                "code": code,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "redirect_uri": self.redirect_uri,
+                "grant_type": "authorization_code",
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_keys(self) -> None:
+        response = await self.http.get(GOOGLE_JWKS_URL)
+        response.raise_for_status()
+        self._keys = {key["kid"]: key for key in response.json()["keys"]}
+        match = MAX_AGE.search(response.headers.get("cache-control", ""))
+        now = time.monotonic()
+        self._keys_expire_at = now + (int(match.group(1)) if match else 3600)
+        self._last_fetch = now
+
+    async def signing_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        """The JWK for kid, refreshing the cached set when it is stale or lacks kid"""
+        if kid in self._keys and time.monotonic() < self._keys_expire_at:
+            return self._keys[kid]
+        async with self._refresh_lock:
+            now = time.monotonic()
+            stale = now >= self._keys_expire_at
+            unknown = kid not in self._keys and now - self._last_fetch >= self.jwks_min_refresh_seconds
+            if stale or unknown:
+                try:
+                    await self._fetch_keys()
+                except httpx.HTTPError as e:
+                    if kid not in self._keys:
+                        raise
+                    # Keep verifying with the expired set while Google is unreachable
+                    logger.warning("Failed to refresh Google signing keys: %s", e)
+        return self._keys.get(kid)
+
+    @traced("GoogleOAuthClient.verify_id_token")
+    async def verify_id_token(self, id_token: str, access_token: Optional[str] = None) -> Dict[str, Any]:
+        """Verify an id_token's signature, audience, issuer and expiry; returns its claims"""
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except JOSEError as e:
+            raise InvalidIdToken(str(e)) from e
+        key = await self.signing_key(header.get("kid", ""))
+        if key is None:
+            raise InvalidIdToken("id_token signed with an unknown key")
+        try:
+            return jwt.decode(
+                id_token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=self.client_id,
+                issuer=GOOGLE_ISSUERS,
+                access_token=access_token,
+                options={"leeway": self.clock_skew_seconds}
+            )
+        except JOSEError as e:
+            raise InvalidIdToken(str(e)) from e
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+
+def create_google_client() -> GoogleOAuthClient:
+    http = httpx.AsyncClient(
+        http2=True,
+        timeout=settings.google_http_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.google_http_max_connections,
+            keepalive_expiry=settings.google_http_keepalive_seconds
+        )
+    )
+    return GoogleOAuthClient(
+        http,
+        client_id=settings.google_client_id,
+        client_secret=settings.google_client_secret,
+        redirect_uri=f"{settings.frontend_url}/auth/callback",
+        jwks_min_refresh_seconds=settings.google_jwks_min_refresh_seconds
+    )
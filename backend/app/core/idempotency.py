@@ -0,0 +1,273 @@
+import base64
+import hashlib
+import logging
+from typing import List, Optional, Tuple
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.credentials import credential_identity
+from app.core.metrics import IDEMPOTENCY_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+TODO_PREFIXES = ("/api/v1/todos", "/api/v1/oauth-todos", "/api/v1/personal-todos")
+MAX_KEY_LENGTH = 255
+# Outcomes that say nothing about the request itself; retries must run again
+UNSTORED_STATUSES = {401, 403, 408, 429}
+
+
+def request_fingerprint(scope: Scope, body: bytes) -> str:
+    """Digest of what the request asks for, so a reused key can be told apart"""
+    digest = hashlib.sha256()
+    for part in (scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1")):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class StoredResponse:
+    """A completed response kept for replay"""
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": self.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+class IdempotencyStore:
+    """Idempotency records in Redis, one key per credential and Idempotency-Key.
+
+    A key is claimed with SET NX before the request runs; the claim holds
+    only the request fingerprint and expires after `lock_seconds` if the
+    worker dies. Completing the request overwrites it with the response,
+    kept for `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        ttl_seconds: int,
+        lock_seconds: int,
+        key_prefix: str = "idempotency"
+    ):
+        self.redis = redis_client
+        self.ttl_ms = ttl_seconds * 1000
+        self.lock_ms = lock_seconds * 1000
+        self.key_prefix = key_prefix
+
+    def key(self, identity: str, idempotency_key: str) -> str:
+        digest = hashlib.sha256(idempotency_key.encode()).hexdigest()[:32]
+        return f"{self.key_prefix}:{identity}:{digest}"
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Claim key for a new request; returns None when claimed, else the existing record.
+
+        If the key keeps changing hands between SET and GET, another request
+        is racing for it; that is reported as an in-flight record, never as
+        a claim this request does not hold.
+        """
+        for _ in range(2):
+            if await self.redis.set(key, orjson.dumps({"fingerprint": fingerprint}), nx=True, px=self.lock_ms):
+                return None
+            raw = await self.redis.get(key)
+            if raw is not None:
+                return orjson.loads(raw)
+            # Expired between SET and GET; try to claim it again
+        return {"fingerprint": fingerprint}
+
+    async def complete(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        record = {
+            "fingerprint": fingerprint,
+            "status": response.status,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers],
+            "body": base64.b64encode(response.body).decode(),
+        }
+        await self.redis.set(key, orjson.dumps(record), px=self.ttl_ms)
+
+    async def release(self, key: str) -> None:
+        await self.redis.delete(key)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+    @staticmethod
+    def stored_response(record: dict) -> Optional[StoredResponse]:
+        """The response in a completed record, or None while it is in flight"""
+        if "status" not in record:
+            return None
+        return StoredResponse(
+            record["status"],
+            [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]],
+            base64.b64decode(record["body"]),
+        )
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    timeout = settings.idempotency_redis_timeout_ms / 1000
+    client = aioredis.from_url(settings.redis_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+    return IdempotencyStore(
+        client,
+        ttl_seconds=settings.idempotency_ttl_seconds,
+        lock_seconds=settings.idempotency_lock_seconds
+    )
+
+
+def _error(status_code: int, detail: str, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """Honour `Idempotency-Key` on todo create, update and delete requests.
+
+    The first request with a key runs and its response is stored; a retry
+    with the same key and request gets the stored response replayed without
+    reaching the routes. A retry while the first is still running gets 409,
+    and reusing a key for a different request gets 422. Uses the store on
+    `app.state.idempotency_store`; if Redis fails the request runs without
+    idempotency rather than failing.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: Tuple[str, ...] = TODO_PREFIXES,
+        max_body: int = settings.idempotency_max_body
+    ):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        store: Optional[IdempotencyStore] = None
+        idempotency_key = None
+        if (
+            scope["type"] == "http"
+            and scope["method"] in MUTATING_METHODS
+            and scope["path"].startswith(self.path_prefixes)
+        ):
+            idempotency_key = Headers(scope=scope).get("idempotency-key")
+            store = getattr(scope["app"].state, "idempotency_store", None)
+        if store is None or idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            response = _error(400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            await response(scope, receive, send)
+            return
+
+        body, receive = await _buffer_body(receive)
+        fingerprint = request_fingerprint(scope, body)
+        key = store.key(credential_identity(scope), idempotency_key)
+
+        try:
+            record = await store.claim(key, fingerprint)
+        except (RedisError, OSError) as e:
+            logger.warning("Idempotency store unavailable, running request without it: %s", e)
+            IDEMPOTENCY_REQUESTS.labels(result="error").inc()
+            await self.app(scope, receive, send)
+            return
+
+        if record is not None:
+            response = self._existing(record, fingerprint)
+            await response(scope, receive, send)
+            return
+
+        IDEMPOTENCY_REQUESTS.labels(result="new").inc()
+        await self._run(scope, receive, send, store, key, fingerprint)
+
+    def _existing(self, record: dict, fingerprint: str):
+        if record["fingerprint"] != fingerprint:
+            IDEMPOTENCY_REQUESTS.labels(result="mismatch").inc()
+            return _error(422, "Idempotency-Key was already used for a different request")
+        stored = IdempotencyStore.stored_response(record)
+        if stored is None:
+            IDEMPOTENCY_REQUESTS.labels(result="in_flight").inc()
+            return _error(
+                409,
+                "A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "1"}
+            )
+        IDEMPOTENCY_REQUESTS.labels(result="replayed").inc()
+        return stored
+
+    async def _run(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        store: IdempotencyStore,
+        key: str,
+        fingerprint: str
+    ) -> None:
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        complete = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, complete
+            if message["type"] == "http.response.start":
+                # Outer middleware may rewrite the headers in place
+                start = {**message, "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= self.max_body:
+                    chunks.append(body)
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        stored = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+            status = start["status"] if start else 500
+            if complete and size <= self.max_body and status < 500 and status not in UNSTORED_STATUSES:
+                stored = StoredResponse(status, start["headers"], b"".join(chunks))
+        finally:
+            try:
+                if stored is not None:
+                    await store.complete(key, fingerprint, stored)
+                else:
+                    # Let a retry run the request again
+                    await store.release(key)
+            except (RedisError, OSError) as e:
+                logger.warning("Failed to record idempotent response: %s", e)
+                IDEMPOTENCY_REQUESTS.labels(result="error").inc()
+
+
+async def _buffer_body(receive: Receive) -> Tuple[bytes, Receive]:
+    """Read the whole request body and return it with a receive that replays it"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
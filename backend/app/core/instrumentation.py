@@ -0,0 +1,125 @@
+import time
+from redis import Redis
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_HOLD,
+    DB_POOL_OVERFLOW,
+    DB_POOL_WAIT,
+    DB_STATEMENT_DURATION,
+    REDIS_COMMAND_DURATION,
+)
+from app.core.query_stats import current_query_stats
+from app.core.tracing import start_span
+
+
+class MetricsMiddleware:
+    """Record per-route latency and in-flight requests.
+
+    Requests are labelled with the route template (`/api/v1/todos/{todo_id}`)
+    rather than the raw path to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=route.path if route is not None else "unmatched",
+                status=str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(pool=self.metrics_name).observe(time.perf_counter() - start)
+
+
+def _statement_operation(statement: str) -> str:
+    parts = statement.split(None, 1)
+    return parts[0].upper() if parts else "UNKNOWN"
+
+
+def instrument_engine(engine: Engine, name: str = "default") -> None:
+    """Attach pool and statement timing listeners to an engine"""
+    pool = engine.pool
+    pool.metrics_name = name
+
+    def update_pool_gauges() -> None:
+        DB_POOL_CHECKED_OUT.labels(pool=name).set(pool.checkedout())
+        if isinstance(pool, QueuePool):
+            DB_POOL_OVERFLOW.labels(pool=name).set(max(pool.overflow(), 0))
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(pool=name).inc()
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        update_pool_gauges()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            DB_POOL_HOLD.labels(pool=name).observe(time.perf_counter() - checked_out_at)
+        update_pool_gauges()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start_time = time.perf_counter()
+        context._query_span = start_span("db.query", statement=statement)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start_time
+        context._query_span.end()
+        DB_STATEMENT_DURATION.labels(operation=_statement_operation(statement)).observe(elapsed)
+        stats = current_query_stats()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that records per-command latency"""
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(command=str(args[0]).upper()).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,179 @@
+import os
+from typing import Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+# HTTP metrics
+HTTP_REQUEST_DURATION = Histogram(
+    "yata_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "yata_http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+
+# Compression metrics
+COMPRESSION_CPU_SECONDS = Counter(
+    "yata_http_compression_cpu_seconds_total",
+    "CPU time spent compressing response bodies",
+    ["encoding"],
+)
+COMPRESSION_BYTES = Counter(
+    "yata_http_compression_bytes_total",
+    "Response bytes before (stage=in) and after (stage=out) compression",
+    ["encoding", "stage"],
+)
+COMPRESSION_CACHE_REQUESTS = Counter(
+    "yata_http_compression_cache_requests_total",
+    "Lookups of cached compressed variants by result",
+    ["result"],
+)
+
+# Database metrics
+DB_POOL_CHECKOUTS = Counter(
+    "yata_db_pool_checkouts_total",
+    "Connections checked out of the SQLAlchemy pool",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "yata_db_pool_checked_out",
+    "Connections currently checked out of the SQLAlchemy pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "yata_db_pool_overflow",
+    "Connections open beyond the pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "yata_db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=FAST_LATENCY_BUCKETS,
+)
+DB_POOL_HOLD = Histogram(
+    "yata_db_pool_hold_seconds",
+    "Time a connection stays checked out of the pool",
+    ["pool"],
+    buckets=FAST_LATENCY_BUCKETS,
+)
+DB_STATEMENT_DURATION = Histogram(
+    "yata_db_statement_duration_seconds",
+    "SQL statement execution time by operation",
+    ["operation"],
+    buckets=FAST_LATENCY_BUCKETS,
+)
+
+# Redis metrics
+REDIS_COMMAND_DURATION = Histogram(
+    "yata_redis_command_duration_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=FAST_LATENCY_BUCKETS,
+)
+
+# Auth metrics
+AUTH_REQUESTS = Counter(
+    "yata_auth_requests_total",
+    "Authenticated requests by auth mode and outcome",
+    ["mode", "outcome"],
+)
+AUTH_CACHE_REQUESTS = Counter(
+    "yata_auth_cache_requests_total",
+    "Auth cache lookups by cache and result",
+    ["cache", "result"],
+)
+
+# Admission control metrics
+ADMISSION_LIMIT = Gauge(
+    "yata_admission_limit",
+    "Current adaptive concurrency limit",
+    multiprocess_mode="liveall",
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "yata_admission_in_flight",
+    "Requests holding an admission slot",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "yata_admission_queue_wait_seconds",
+    "Time queued requests waited for an admission slot",
+    ["priority"],
+    buckets=FAST_LATENCY_BUCKETS,
+)
+ADMISSION_REJECTIONS = Counter(
+    "yata_admission_rejections_total",
+    "Requests answered 503 by admission control",
+    ["priority", "reason"],
+)
+
+# Rate limit metrics
+RATE_LIMIT_DECISIONS = Counter(
+    "yata_rate_limit_decisions_total",
+    "Rate limit decisions by bucket, result and backend",
+    ["bucket", "result", "backend"],
+)
+
+# Request coalescing metrics; hit rate = follower / (leader + follower)
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "yata_single_flight_requests_total",
+    "Coalescible GET requests by role: leader ran, follower shared its response, fallback ran after a failed leader",
+    ["result"],
+)
+
+# Idempotency metrics
+IDEMPOTENCY_REQUESTS = Counter(
+    "yata_idempotency_requests_total",
+    "Requests carrying an Idempotency-Key by outcome",
+    ["result"],
+)
+
+# Scheduler metrics
+SCHEDULER_JOB_RUNS = Counter(
+    "yata_scheduler_job_runs_total",
+    "Scheduled job runs by outcome",
+    ["job", "status"],
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "yata_scheduler_job_duration_seconds",
+    "Scheduled job run duration",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+SCHEDULER_JOB_ROWS = Counter(
+    "yata_scheduler_job_rows_total",
+    "Rows affected by scheduled jobs",
+    ["job"],
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render metrics in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set, every worker writes its samples to its
+    own mmap file and the scrape merges the files, so workers never share a
+    lock and any worker can answer the scrape.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
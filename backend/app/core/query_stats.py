@@ -0,0 +1,86 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements executed while serving one request"""
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Dict[str, int] = {}
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else "-"
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        repeats = self.statements.get(statement, 0) + 1
+        self.statements[statement] = repeats
+
+        if elapsed * 1000 >= settings.slow_query_threshold_ms:
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s", elapsed * 1000, self.route, statement
+            )
+        if repeats == settings.n_plus_one_threshold:
+            logger.warning(
+                "Possible N+1 on %s, statement repeated %d times: %s",
+                self.route, repeats, statement
+            )
+        if self.count == settings.sql_query_budget + 1 and settings.sql_query_budget > 0:
+            logger.warning(
+                "Query budget of %d exceeded on %s", settings.sql_query_budget, self.route
+            )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(scope: Optional[Scope] = None) -> Iterator[QueryStats]:
+    """Collect statements executed in the current context"""
+    stats = QueryStats(scope)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryStatsMiddleware:
+    """Count and time SQL per request; expose totals as Server-Timing in debug mode"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(scope) as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.debug:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
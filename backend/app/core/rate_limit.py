@@ -0,0 +1,276 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.credentials import bearer_token, client_address, credential_identity, oauth_token_client_key
+from app.core.metrics import RATE_LIMIT_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Bucket charged for each 401 from an address and checked on every request
+BACKSTOP_BUCKET = "auth_failure"
+
+# Refill and take one token atomically; uses the Redis clock so every
+# worker sees the same time. An optional second key is a backstop bucket
+# that must hold a token but is not charged. Returns {allowed, tokens
+# left, retry after}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+if KEYS[2] then
+    local backstop_capacity = tonumber(ARGV[3])
+    local backstop_rate = tonumber(ARGV[4])
+    local backstop = redis.call('HMGET', KEYS[2], 'tokens', 'ts')
+    local backstop_tokens = math.min(
+        backstop_capacity,
+        (tonumber(backstop[1]) or backstop_capacity) + math.max(0, now - (tonumber(backstop[2]) or now)) * backstop_rate
+    )
+    if backstop_tokens < 1 then
+        return {0, '0', tostring((1 - backstop_tokens) / backstop_rate)}
+    end
+end
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class Limit(NamedTuple):
+    capacity: int
+    rate: float  # tokens per second
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class LocalTokenBuckets:
+    """In-process token buckets used while Redis is unavailable.
+
+    Limits then apply per worker rather than globally, which is looser but
+    keeps a runaway client bounded.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def peek(self, key: str, limit: Limit) -> float:
+        """Tokens currently in the bucket, without taking one"""
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (limit.capacity, now))
+        return min(limit.capacity, tokens + (now - ts) * limit.rate)
+
+    def take(self, key: str, limit: Limit) -> Decision:
+        now = time.monotonic()
+        tokens = self.peek(key, limit)
+        if tokens >= 1:
+            decision = Decision(True, tokens - 1, 0.0)
+        else:
+            decision = Decision(False, tokens, (1 - tokens) / limit.rate)
+        self._buckets[key] = (decision.remaining, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return decision
+
+
+class RateLimiter:
+    """Token buckets in Redis, one EVALSHA round trip per decision.
+
+    After a Redis error or timeout the local buckets are used for
+    `fallback_seconds` before Redis is tried again, so a slow Redis costs
+    at most one timeout per window instead of one per request.
+
+    OAuth access tokens are resolved to their client through the mapping
+    OAuthService writes when it issues a token, cached per worker.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        limits: Dict[str, Limit],
+        key_prefix: str = "ratelimit",
+        fallback_seconds: float = 5
+    ):
+        self.redis = redis_client
+        self.limits = limits
+        self.key_prefix = key_prefix
+        self.fallback_seconds = fallback_seconds
+        self.local = LocalTokenBuckets()
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._redis_down_until = 0.0
+        self._oauth_clients: "OrderedDict[str, str]" = OrderedDict()
+        self._oauth_clients_max = 10000
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning("Rate limiter falling back to local buckets: %s", error)
+        self._redis_down_until = time.monotonic() + self.fallback_seconds
+
+    async def take(self, identity: str, bucket: str, backstop: Optional[str] = None) -> Tuple[Decision, str]:
+        """Take a token for identity from bucket; returns the decision and backend used.
+
+        With `backstop`, the request is refused without taking a token while
+        that identity's BACKSTOP_BUCKET is empty.
+        """
+        limit = self.limits[bucket]
+        key = f"{self.key_prefix}:{bucket}:{identity}"
+        keys, args = [key], [limit.capacity, limit.rate]
+        if backstop is not None:
+            backstop_limit = self.limits[BACKSTOP_BUCKET]
+            backstop_key = f"{self.key_prefix}:{BACKSTOP_BUCKET}:{backstop}"
+            keys.append(backstop_key)
+            args.extend([backstop_limit.capacity, backstop_limit.rate])
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                allowed, remaining, retry_after = await self._script(keys=keys, args=args)
+                return Decision(bool(int(allowed)), float(remaining), float(retry_after)), "redis"
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        if backstop is not None:
+            backstop_tokens = self.local.peek(backstop_key, backstop_limit)
+            if backstop_tokens < 1:
+                return Decision(False, 0.0, (1 - backstop_tokens) / backstop_limit.rate), "local"
+        return self.local.take(key, limit), "local"
+
+    async def oauth_client(self, token: str) -> Optional[str]:
+        """client_id an OAuth access token was issued to, or None if unknown"""
+        key = oauth_token_client_key(token)
+        client_id = self._oauth_clients.get(key)
+        if client_id is not None:
+            self._oauth_clients.move_to_end(key)
+            return client_id
+        if time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            raw = await self.redis.get(key)
+        except (RedisError, OSError) as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        client_id = raw.decode()
+        self._oauth_clients[key] = client_id
+        while len(self._oauth_clients) > self._oauth_clients_max:
+            self._oauth_clients.popitem(last=False)
+        return client_id
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_rate_limiter() -> RateLimiter:
+    timeout = settings.rate_limit_redis_timeout_ms / 1000
+    client = aioredis.from_url(settings.redis_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+    return RateLimiter(
+        client,
+        {
+            "read": Limit(settings.rate_limit_read_burst, settings.rate_limit_read_per_minute / 60),
+            "write": Limit(settings.rate_limit_write_burst, settings.rate_limit_write_per_minute / 60),
+            BACKSTOP_BUCKET: Limit(
+                settings.rate_limit_auth_failure_burst, settings.rate_limit_auth_failure_per_minute / 60
+            ),
+        },
+        fallback_seconds=settings.rate_limit_fallback_seconds
+    )
+
+
+class RateLimitMiddleware:
+    """Rate limit API requests per credential, with separate read and write buckets.
+
+    OAuth tokens are limited per client. Bearer tokens that can't be tied
+    to a client, or that have a shape we never issue, are limited per IP,
+    so rotating made-up tokens gains nothing. Every 401 is also charged to
+    the IP's backstop bucket; while that is empty the IP's requests are
+    refused before they reach authentication.
+
+    Uses the RateLimiter on `app.state.rate_limiter`, created in the
+    lifespan; without one requests pass through unlimited.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/api/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter: Optional[RateLimiter] = None
+        if scope["type"] == "http" and scope["path"].startswith(self.path_prefix):
+            limiter = getattr(scope["app"].state, "rate_limiter", None)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        bucket = "read" if scope["method"] in READ_METHODS else "write"
+        address = client_address(scope)
+        decision, backend = await limiter.take(await self._identity(scope, limiter), bucket, backstop=address)
+        RATE_LIMIT_DECISIONS.labels(
+            bucket=bucket, result="allowed" if decision.allowed else "limited", backend=backend
+        ).inc()
+
+        limit = limiter.limits[bucket]
+        rate_headers = {
+            "X-RateLimit-Limit": str(limit.capacity),
+            "X-RateLimit-Remaining": str(int(decision.remaining)),
+            "X-RateLimit-Reset": str(math.ceil((limit.capacity - decision.remaining) / limit.rate)),
+        }
+
+        if not decision.allowed:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={**rate_headers, "Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        status = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        if status == 401:
+            await limiter.take(address, BACKSTOP_BUCKET)
+
+    @staticmethod
+    async def _identity(scope: Scope, limiter: RateLimiter) -> str:
+        identity = credential_identity(scope)
+        kind = identity.partition(":")[0]
+        if kind == "oauth":
+            client_id = await limiter.oauth_client(bearer_token(Headers(scope=scope)))
+            # Same key as client credentials on the token endpoint
+            return f"oauth_client:{client_id}" if client_id else client_address(scope)
+        if kind == "bearer":
+            return client_address(scope)
+        return identity
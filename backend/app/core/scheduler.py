@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, Dict, List, Optional, Union
+from redis import Redis
+from app.core.metrics import SCHEDULER_JOB_RUNS, SCHEDULER_JOB_DURATION, SCHEDULER_JOB_ROWS
+
+logger = logging.getLogger(__name__)
+
+JobResult = Union[int, Dict[str, int], None]
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], JobResult],
+        interval_seconds: int,
+        jitter_seconds: int = 0
+    ):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+
+    def next_slot(self, now: float) -> int:
+        """Start of the next interval slot, aligned to the wall clock like cron"""
+        return (int(now) // self.interval_seconds + 1) * self.interval_seconds
+
+
+class Scheduler:
+    """In-process asyncio scheduler for periodic maintenance jobs.
+
+    Runs are aligned to wall-clock slots (an hourly job fires at the top of
+    every hour) plus random jitter. Before running, each replica tries to
+    claim the slot with a Redis SET NX; the key lives for the whole slot, so
+    exactly one replica runs each job per slot.
+    """
+
+    def __init__(self, redis_client: Redis, key_prefix: str = "scheduler"):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.jobs: List[Job] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], JobResult],
+        interval_seconds: int,
+        jitter_seconds: int = 0
+    ) -> Job:
+        """Register a job; func runs in a worker thread and returns a row count"""
+        job = Job(name, func, interval_seconds, jitter_seconds)
+        self.jobs.append(job)
+        return job
+
+    def start(self) -> None:
+        for job in self.jobs:
+            self._tasks.append(asyncio.create_task(self._run_forever(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _claim(self, job: Job, slot: int) -> bool:
+        """Try to become the leader for one run of a job"""
+        key = f"{self.key_prefix}:{job.name}:{slot}"
+        return bool(self.redis_client.set(key, "1", nx=True, ex=job.interval_seconds))
+
+    async def _run_forever(self, job: Job) -> None:
+        while True:
+            slot = job.next_slot(time.time())
+            delay = slot - time.time() + random.uniform(0, job.jitter_seconds)
+            await asyncio.sleep(max(delay, 0))
+            try:
+                claimed = await asyncio.to_thread(self._claim, job, slot)
+            except Exception:
+                logger.exception("Scheduler could not claim job %s", job.name)
+                continue
+            if claimed:
+                await self.run_job(job)
+
+    async def run_job(self, job: Job) -> Optional[int]:
+        """Run a job once and record its duration and row count"""
+        start = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(job.func)
+        except Exception:
+            SCHEDULER_JOB_RUNS.labels(job=job.name, status="error").inc()
+            logger.exception("Scheduled job %s failed", job.name)
+            return None
+        finally:
+            SCHEDULER_JOB_DURATION.labels(job=job.name).observe(time.perf_counter() - start)
+
+        if isinstance(result, dict):
+            rows = sum(result.values())
+        else:
+            rows = result or 0
+        SCHEDULER_JOB_RUNS.labels(job=job.name, status="success").inc()
+        SCHEDULER_JOB_ROWS.labels(job=job.name).inc(rows)
+        logger.info("Scheduled job %s finished: %s", job.name, result)
+        return rows
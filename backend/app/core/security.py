@@ -4,9 +4,10 @@ import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedRedis
 
 # Initialize Redis client
-redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+redis_client = InstrumentedRedis.from_url(settings.redis_url, decode_responses=True)
 
 
 class SessionManager:
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.credentials import credential_identity
+from app.core.metrics import SINGLE_FLIGHT_REQUESTS
+
+TODO_PREFIXES = ("/api/v1/todos", "/api/v1/oauth-todos", "/api/v1/personal-todos")
+
+FlightKey = Tuple[str, str, bytes]
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class SharedResponse:
+    """A leader's complete response, replayed to requests that waited on it"""
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Each replay gets its own header list; outer middleware edits it in place
+        await send({"type": "http.response.start", "status": self.status, "headers": list(self.headers)})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+class SingleFlightMiddleware:
+    """Coalesce concurrent identical GET requests within this worker.
+
+    Requests are identical when they present the same credential for the
+    same path and query string. The first (the leader) runs; requests that
+    arrive while it is in flight wait for it and get the same status,
+    headers and body, so they cost no query, serialization or admission
+    slot. When the leader fails, is cancelled or its response can't be
+    shared, each waiter runs on its own.
+
+    A todo mutation retires the in-flight reads of its credential before
+    its response goes out, so a read sent after the write never joins a
+    flight that started before it. Like the flights, this is per worker.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: Tuple[str, ...] = TODO_PREFIXES):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self._flights: Dict[FlightKey, asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] not in READ_METHODS:
+            await self._mutate(scope, receive, send)
+            return
+        if scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        key = (credential_identity(scope), scope["path"], scope.get("query_string", b""))
+        flight = self._flights.get(key)
+        if flight is not None:
+            shared = await asyncio.shield(flight)
+            if shared is not None:
+                SINGLE_FLIGHT_REQUESTS.labels(result="follower").inc()
+                await shared(scope, receive, send)
+                return
+            SINGLE_FLIGHT_REQUESTS.labels(result="fallback").inc()
+            await self.app(scope, receive, send)
+            return
+
+        SINGLE_FLIGHT_REQUESTS.labels(result="leader").inc()
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        shared = None
+        try:
+            shared = await self._lead(scope, receive, send)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.set_result(shared)
+
+    async def _mutate(self, scope: Scope, receive: Receive, send: Send) -> None:
+        identity = credential_identity(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._retire(identity)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._retire(identity)
+
+    def _retire(self, identity: str) -> None:
+        """Stop new reads joining the credential's current flights; they still complete"""
+        for key in [key for key in self._flights if key[0] == identity]:
+            del self._flights[key]
+
+    async def _lead(self, scope: Scope, receive: Receive, send: Send) -> Optional[SharedResponse]:
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        complete = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, complete
+            if message["type"] == "http.response.start":
+                # Outer middleware may rewrite the headers in place
+                start = {**message, "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        if start is None or not complete or start["status"] >= 500:
+            return None
+        if any(name.lower() == b"set-cookie" for name, _ in start["headers"]):
+            return None
+        return SharedResponse(start["status"], start["headers"], b"".join(chunks))
@@ -0,0 +1,272 @@
+"""Lightweight W3C trace-context tracing with local exporters.
+
+Spans are only recorded below a sampled root span; with sampling off every
+`span()` call returns a shared no-op object, so instrumented code pays for a
+contextvar lookup and nothing else.
+"""
+import functools
+import inspect
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status")
+
+    sampled = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        exporter.export(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    sampled = False
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileSpanExporter:
+    """Append finished spans to a JSON-lines file, rotating it past max_bytes.
+
+    Rotated files are kept as `path.1` .. `path.<backups>`, oldest dropped.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backups: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", buffering=1)
+            if self.max_bytes and self._file.tell() + len(line) > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "w", buffering=1)
+
+
+class InMemorySpanExporter:
+    """Keep the most recent finished spans in process"""
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def get_trace(self, trace_id: str) -> List[Span]:
+        return [span for span in self.spans if span.trace_id == trace_id]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class _NoopExporter:
+    def export(self, span: Span) -> None:
+        pass
+
+
+def _create_exporter():
+    if settings.tracing_exporter == "file":
+        return FileSpanExporter(
+            settings.tracing_file,
+            max_bytes=settings.tracing_file_max_bytes,
+            backups=settings.tracing_file_backups,
+        )
+    if settings.tracing_exporter == "memory":
+        return InMemorySpanExporter()
+    return _NoopExporter()
+
+
+exporter = _create_exporter()
+
+_current_span: ContextVar[Any] = ContextVar("current_span", default=NOOP_SPAN)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes: Any):
+    """Start a child of the current span without making it current"""
+    parent = _current_span.get()
+    if not parent.sampled:
+        return NOOP_SPAN
+    child = Span(name, parent.trace_id, parent.span_id)
+    if attributes:
+        child.attributes.update(attributes)
+    return child
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Record a child span of the current span for the duration of the block"""
+    child = start_span(name, **attributes)
+    if not child.sampled:
+        yield child
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.status = f"error: {type(exc).__name__}"
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def traced(name: Optional[str] = None):
+    """Decorator recording a span around each call of a sync or async function"""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def parse_traceparent(value: Optional[str]):
+    """Parse a W3C traceparent header into (trace_id, parent_id, sampled)"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3][:2], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 0x01)
+
+
+class TracingMiddleware:
+    """Open a root span per request, continuing an incoming traceparent.
+
+    Requests are sampled at TRACING_SAMPLE_RATIO. The upstream sampled flag
+    is only followed with TRACING_TRUST_UPSTREAM, so arbitrary clients
+    cannot force span export.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        if incoming is not None:
+            trace_id, parent_id, upstream_sampled = incoming
+        else:
+            trace_id, parent_id, upstream_sampled = None, None, False
+        if settings.tracing_trust_upstream and incoming is not None:
+            sampled = upstream_sampled
+        else:
+            sampled = random.random() < settings.tracing_sample_ratio
+
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(f"HTTP {scope['method']}", trace_id or secrets.token_hex(16), parent_id)
+        root.set_attribute("http.target", scope["path"])
+        token = _current_span.set(root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            root.status = f"error: {type(exc).__name__}"
+            raise
+        finally:
+            _current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"HTTP {scope['method']} {route.path}"
+            root.end()
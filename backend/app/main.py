@@ -1,22 +1,106 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.responses import ORJSONResponse
+from app.core.admission import AdmissionMiddleware, create_admission_controller
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import engine
-from app.models import user, todo, oauth_client, oauth_token, personal_token
-from app.api.v1 import auth, todos, oauth, oauth_todos, personal_tokens, personal_todos
+from app.core.google_oauth import create_google_client
+from app.core.idempotency import IdempotencyMiddleware, create_idempotency_store
+from app.core.database import engines, init_schema, warm_pool, SessionLocal
+from app.core.instrumentation import MetricsMiddleware
+from app.core.metrics import render_metrics
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.rate_limit import RateLimitMiddleware, create_rate_limiter
+from app.core.scheduler import Scheduler
+from app.core.single_flight import SingleFlightMiddleware
+from app.core.tracing import TracingMiddleware
+from app.core.security import redis_client
+from app.api.v1 import auth, todos, oauth, personal_tokens
+from app.services.maintenance_service import MaintenanceService
+from app.services.personal_token_service import PersonalTokenService
+
+def reap_expired_tokens():
+    db = SessionLocal()
+    try:
+        return MaintenanceService.reap_expired_tokens(db)
+    finally:
+        db.close()
+
+
+def flush_token_usage():
+    db = SessionLocal()
+    try:
+        return PersonalTokenService.flush_usage(db)
+    finally:
+        db.close()
+
+
+def warm_up():
+    """Connect the DB and Redis pools before the worker accepts traffic"""
+    for pool_engine in engines.values():
+        warm_pool(pool_engine)
+    redis_client.ping()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Under gunicorn the master has already done this; workers just
+    # confirm it, one at a time
+    await asyncio.to_thread(init_schema)
+    if settings.pool_warmup:
+        await asyncio.to_thread(warm_up)
+    scheduler = Scheduler(redis_client)
+    scheduler.add_job(
+        "reap_expired_tokens",
+        reap_expired_tokens,
+        interval_seconds=settings.token_reaper_interval_seconds,
+        jitter_seconds=settings.scheduler_jitter_seconds
+    )
+    scheduler.add_job(
+        "flush_token_usage",
+        flush_token_usage,
+        interval_seconds=settings.token_usage_flush_interval_seconds,
+        jitter_seconds=min(settings.scheduler_jitter_seconds, settings.token_usage_flush_interval_seconds // 2)
+    )
+    if settings.scheduler_enabled:
+        scheduler.start()
+    app.state.scheduler = scheduler
+    app.state.google_client = create_google_client()
+    if settings.rate_limit_enabled:
+        app.state.rate_limiter = create_rate_limiter()
+    if settings.idempotency_enabled:
+        app.state.idempotency_store = create_idempotency_store()
+    yield
+    await scheduler.stop()
+    await app.state.google_client.close()
+    if settings.rate_limit_enabled:
+        await app.state.rate_limiter.close()
+    if settings.idempotency_enabled:
+        await app.state.idempotency_store.close()
 
-# Create database tables
-user.Base.metadata.create_all(bind=engine)
-todo.Base.metadata.create_all(bind=engine)
-oauth_client.Base.metadata.create_all(bind=engine)
-oauth_token.Base.metadata.create_all(bind=engine)
-personal_token.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.app_name,
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Admission and rate limiting sit inside CORS, so 503/429 responses keep
+# CORS headers and preflights never count; rate-limited requests are
+# rejected before taking an admission slot. Idempotent replays and
+# coalesced reads are served after rate limiting but without an admission slot.
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, controller=create_admission_controller())
+if settings.single_flight_enabled:
+    app.add_middleware(SingleFlightMiddleware)
+if settings.idempotency_enabled:
+    app.add_middleware(IdempotencyMiddleware)
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,14 +109,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Include API routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(todos.router, prefix="/api/v1/todos", tags=["todos"])
 app.include_router(oauth.router, prefix="/api/v1/oauth", tags=["oauth"])
-app.include_router(oauth_todos.router, prefix="/api/v1/oauth-todos", tags=["oauth-todos"])
 app.include_router(personal_tokens.router, prefix="/api/v1/personal-tokens", tags=["personal-tokens"])
-app.include_router(personal_todos.router, prefix="/api/v1/personal-todos", tags=["personal-todos"])
+# The todo routes accept any credential; the old per-credential prefixes
+# remain as aliases for existing MCP configurations
+for alias in ("/api/v1/oauth-todos", "/api/v1/personal-todos"):
+    app.include_router(todos.router, prefix=alias, include_in_schema=False)
 
 
 @app.get("/")
@@ -42,4 +133,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
\ No newline at end of file
@@ -2,5 +2,6 @@ from app.models.user import User
 from app.models.todo import Todo
 from app.models.oauth_client import OAuthClient
 from app.models.oauth_token import OAuthToken
+from app.models.personal_token import PersonalToken
 
-__all__ = ["User", "Todo", "OAuthClient", "OAuthToken"]
\ No newline at end of file
+__all__ = ["User", "Todo", "OAuthClient", "OAuthToken", "PersonalToken"]
\ No newline at end of file
@@ -1,6 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Boolean, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 
@@ -12,9 +13,13 @@ class OAuthClient(Base):
     client_secret = Column(String, nullable=False)
     client_name = Column(String, nullable=False)
     scopes = Column(Text, nullable=False)  # JSON string of allowed scopes
+    # User the client acts for; null only for clients registered before binding existed
+    user_id = Column(String, ForeignKey("users.id"), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    user = relationship("User")
+
     def __repr__(self):
         return f"<OAuthClient(id={self.id}, client_id={self.client_id})>"
\ No newline at end of file
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -7,6 +7,17 @@ from app.core.database import Base
 
 class OAuthToken(Base):
     __tablename__ = "oauth_tokens"
+    __table_args__ = (
+        # Token reuse lookup: a client's active tokens ordered by expiry
+        Index(
+            "ix_oauth_tokens_client_active",
+            "client_id",
+            "expires_at",
+            postgresql_where=text("is_active"),
+        ),
+        # Expired token reaper
+        Index("ix_oauth_tokens_expires_at", "expires_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     client_id = Column(String, ForeignKey("oauth_clients.client_id"), nullable=False)
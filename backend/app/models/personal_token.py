@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index, BigInteger, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -7,6 +7,17 @@ from app.core.database import Base
 
 class PersonalToken(Base):
     __tablename__ = "personal_tokens"
+    __table_args__ = (
+        # Active token counts and listings per user
+        Index(
+            "ix_personal_tokens_user_active",
+            "user_id",
+            "expires_at",
+            postgresql_where=text("is_active"),
+        ),
+        # Expired token reaper
+        Index("ix_personal_tokens_expires_at", "expires_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(100), nullable=False)
@@ -14,6 +25,7 @@ class PersonalToken(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     last_used_at = Column(DateTime(timezone=True), nullable=True)
+    request_count = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from typing import Any, Dict, List, Optional, Tuple, Type
 from datetime import datetime
 
 
@@ -26,4 +27,74 @@ class TodoResponse(TodoBase):
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+TODO_RESPONSE_FIELDS = tuple(TodoResponse.model_fields)
+
+
+class SparseTodoResponse(BaseModel):
+    """A todo as returned with `?fields=`: only the selected fields are present"""
+    title: Optional[str] = None
+    description: Optional[str] = None
+    completed: Optional[bool] = None
+    id: Optional[str] = None
+    user_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+def parse_todo_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated `fields=` value into TodoResponse field names.
+
+    An empty value selects every field; unknown names, or a value that
+    names no field at all (such as ","), raise ValueError.
+    """
+    if not fields:
+        return TODO_RESPONSE_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    unknown = requested.difference(TODO_RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Schema order, so equal selections share cached schemas and statements
+    return tuple(field for field in TODO_RESPONSE_FIELDS if field in requested)
+
+
+@lru_cache(maxsize=128)
+def sparse_todo_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """TodoResponse restricted to `fields`"""
+    if fields == TODO_RESPONSE_FIELDS:
+        return TodoResponse
+    return create_model(
+        f"TodoResponse_{'_'.join(fields)}",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (TodoResponse.model_fields[name].annotation, TodoResponse.model_fields[name]) for name in fields}
+    )
+
+
+@lru_cache(maxsize=128)
+def _todo_list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[sparse_todo_schema(fields)])
+
+
+def todo_to_dict(todo, fields: Tuple[str, ...] = TODO_RESPONSE_FIELDS) -> Dict[str, Any]:
+    """Copy the TodoResponse fields off a trusted ORM row without validating"""
+    return {field: getattr(todo, field) for field in fields}
+
+
+def serialize_todos(
+    todos,
+    validate: bool = False,
+    fields: Tuple[str, ...] = TODO_RESPONSE_FIELDS
+) -> List[Dict[str, Any]]:
+    """Todo rows as plain dicts ready for orjson.
+
+    Rows loaded by TodoService already satisfy TodoResponse, so validation is
+    skipped by default; with validate=True the list is validated once through
+    a TypeAdapter of the schema for `fields`, so sparse rows pass too.
+    """
+    if validate:
+        adapter = _todo_list_adapter(fields)
+        return adapter.dump_python(adapter.validate_python(todos, from_attributes=True))
+    return [todo_to_dict(todo, fields) for todo in todos]
@@ -0,0 +1,108 @@
+"""Production entry point.
+
+    python -m app.server
+
+Runs gunicorn as the process manager over uvicorn workers on uvloop and
+httptools. Gunicorn owns the listening socket, restarts crashed workers and
+recycles each worker after about `server_max_requests` requests (plus jitter
+so they don't all restart at once). The worker count defaults to the CPU
+cores available to the process. With more than one worker, Prometheus
+metrics are written to a shared PROMETHEUS_MULTIPROC_DIR.
+"""
+import os
+import shutil
+import tempfile
+from typing import Any, Dict
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+from app.core.config import settings
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "proxy_headers": True,
+    }
+
+
+def worker_count() -> int:
+    """Configured workers, or the CPU cores this process may run on"""
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def on_starting(server) -> None:
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        # Samples from a previous run would be merged into the new one
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    # Apply schema changes once, before any worker starts
+    from app.core.database import engines, init_schema
+
+    init_schema()
+    # Workers are forked from here and must not inherit pooled connections
+    for pool_engine in engines.values():
+        pool_engine.dispose()
+
+
+def child_exit(server, worker) -> None:
+    from prometheus_client import multiprocess
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": settings.server_bind,
+        "workers": worker_count(),
+        "worker_class": "app.server.ProductionUvicornWorker",
+        "backlog": settings.server_backlog,
+        "keepalive": settings.server_keepalive_seconds,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "graceful_timeout": settings.server_graceful_timeout_seconds,
+        "timeout": settings.server_worker_timeout_seconds,
+        # Each worker imports the app itself, so Redis pools and pooled
+        # connections are never shared across fork
+        "preload_app": False,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "accesslog": None,
+        "errorlog": "-",
+        "on_starting": on_starting,
+        "child_exit": child_exit,
+    }
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main() -> None:
+    options = gunicorn_options()
+    if options["workers"] > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="yata-metrics-")
+    ProductionServer(options).run()
+
+
+if __name__ == "__main__":
+    main()
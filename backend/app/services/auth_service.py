@@ -1,8 +1,11 @@
-import httpx
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.core.google_oauth import GoogleOAuthClient, InvalidIdToken
 from app.core.security import session_manager
+from app.core.tracing import traced
 from app.models.user import User
 from app.schemas.user import UserCreate
 
@@ -23,69 +26,65 @@ class AuthService:
         return f"https://accounts.google.com/o/oauth2/v2/auth?{param_string}"
     
     @staticmethod
-    async def exchange_code_for_tokens(code: str) -> Dict[str, Any]:
-        """Exchange authorization code for access tokens"""
-        data = {
-            "code": code,
-            "client_id": settings.google_client_id,
-            "client_secret": settings.google_client_secret,
-            "redirect_uri": f"{settings.frontend_url}/auth/callback",
-            "grant_type": "authorization_code",
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data=data
-            )
-            response.raise_for_status()
-            return response.json()
+    @traced()
+    async def exchange_code_for_tokens(google: GoogleOAuthClient, code: str) -> Dict[str, Any]:
+        """Exchange authorization code for access and ID tokens"""
+        return await google.exchange_code(code)
     
     @staticmethod
-    async def get_user_info(access_token: str) -> Dict[str, Any]:
-        """Get user information from Google using access token"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
-            response.raise_for_status()
-            return response.json()
+    @traced()
+    async def get_user_info(google: GoogleOAuthClient, tokens: Dict[str, Any]) -> Dict[str, Any]:
+        """Get user information from the verified ID token, without a userinfo call"""
+        id_token = tokens.get("id_token")
+        if not id_token:
+            raise InvalidIdToken("Token response has no id_token")
+        claims = await google.verify_id_token(id_token, tokens.get("access_token"))
+        return {
+            "id": claims["sub"],
+            "email": claims["email"],
+            "name": claims.get("name") or claims["email"],
+            "picture": claims.get("picture"),
+        }
     
     @staticmethod
+    @traced()
     def create_or_update_user(db: Session, user_info: Dict[str, Any]) -> User:
-        """Create or update user in database"""
-        google_id = user_info["id"]
-        email = user_info["email"]
-        name = user_info["name"]
-        avatar_url = user_info.get("picture")
-        
-        # Check if user already exists
-        user = db.query(User).filter(User.google_id == google_id).first()
-        
-        if user:
-            # Update existing user
-            user.email = email
-            user.name = name
-            user.avatar_url = avatar_url
-            db.commit()
-            db.refresh(user)
-        else:
-            # Create new user
-            user_create = UserCreate(
-                google_id=google_id,
-                email=email,
-                name=name,
-                avatar_url=avatar_url
+        """Create or update user in database with a single UPSERT.
+
+        The conflict update only fires when a profile column actually
+        changed, so logins of unchanged users write no new row version.
+        """
+        user_create = UserCreate(
+            google_id=user_info["id"],
+            email=user_info["email"],
+            name=user_info["name"],
+            avatar_url=user_info.get("picture")
+        )
+        stmt = insert(User).values(**user_create.dict())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.google_id],
+            set_={
+                "email": stmt.excluded.email,
+                "name": stmt.excluded.name,
+                "avatar_url": stmt.excluded.avatar_url,
+                "updated_at": func.now(),
+            },
+            where=or_(
+                User.email.is_distinct_from(stmt.excluded.email),
+                User.name.is_distinct_from(stmt.excluded.name),
+                User.avatar_url.is_distinct_from(stmt.excluded.avatar_url),
             )
-            user = User(**user_create.dict())
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+        ).returning(User)
+        
+        # No row comes back when the user exists and nothing changed
+        user = db.scalars(stmt, execution_options={"populate_existing": True}).first()
+        if user is None:
+            user = db.query(User).filter(User.google_id == user_create.google_id).first()
         
         return user
     
     @staticmethod
+    @traced()
     def create_session(user: User) -> str:
         """Create session for authenticated user"""
         return session_manager.create_session({
@@ -0,0 +1,16 @@
+from typing import Dict
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services.oauth_service import OAuthService
+from app.services.personal_token_service import PersonalTokenService
+
+
+class MaintenanceService:
+    @staticmethod
+    def reap_expired_tokens(db: Session) -> Dict[str, int]:
+        """Delete expired OAuth and personal tokens in bounded batches"""
+        batch_size = settings.token_reaper_batch_size
+        return {
+            "oauth_tokens": OAuthService.cleanup_expired_tokens(db, batch_size),
+            "personal_tokens": PersonalTokenService.cleanup_expired_tokens(db, batch_size),
+        }
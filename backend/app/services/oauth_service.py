@@ -1,11 +1,21 @@
 import json
+import logging
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.orm import Session, contains_eager
 from app.core.config import settings
+from app.core.credentials import oauth_token_client_key
+from app.core.database import delete_in_batches
+from app.core.security import redis_client
+from app.core.tracing import traced
 from app.models.oauth_client import OAuthClient
 from app.models.oauth_token import OAuthToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
 
 
 class OAuthService:
@@ -13,21 +23,24 @@ class OAuthService:
     def create_client(
         db: Session, 
         client_name: str, 
-        scopes: List[str]
+        scopes: List[str],
+        user: User
     ) -> OAuthClient:
-        """Create a new OAuth client"""
+        """Create a new OAuth client acting for user"""
         client = OAuthClient(
             client_id=secrets.token_urlsafe(32),
             client_secret=secrets.token_urlsafe(64),
             client_name=client_name,
-            scopes=json.dumps(scopes)
+            scopes=json.dumps(scopes),
+            user_id=user.id
         )
         db.add(client)
-        db.commit()
+        db.flush()
         db.refresh(client)
         return client
     
     @staticmethod
+    @traced()
     def authenticate_client(
         db: Session, 
         client_id: str, 
@@ -41,39 +54,109 @@ class OAuthService:
         ).first()
     
     @staticmethod
+    @traced()
     def generate_token(
         db: Session, 
         client: OAuthClient, 
         scopes: List[str]
     ) -> OAuthToken:
-        """Generate access token for client"""
-        # Deactivate existing tokens for this client
-        db.query(OAuthToken).filter(
-            OAuthToken.client_id == client.client_id,
-            OAuthToken.is_active == True
-        ).update({"is_active": False})
+        """Generate access token for client.
+
+        With token reuse enabled, a still-valid token with the same scopes is
+        returned instead of minting a new one, so MCP instances sharing a
+        client converge on one token rather than revoking each other's.
+        """
+        scopes_json = json.dumps(sorted(set(scopes)))
+        
+        if settings.oauth_token_reuse:
+            # Serialize issuance per client until this transaction ends
+            db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                {"key": f"oauth_token:{client.client_id}"}
+            )
+            
+            min_expires_at = datetime.utcnow() + timedelta(
+                seconds=settings.oauth_token_reuse_min_remaining_seconds
+            )
+            token = db.query(OAuthToken).filter(
+                OAuthToken.client_id == client.client_id,
+                OAuthToken.is_active == True,
+                OAuthToken.scopes == scopes_json,
+                OAuthToken.expires_at > min_expires_at
+            ).order_by(OAuthToken.expires_at.desc()).first()
+            
+            if token:
+                OAuthService.remember_token_client(token)
+                return token
+        else:
+            # Deactivate existing tokens for this client
+            db.query(OAuthToken).filter(
+                OAuthToken.client_id == client.client_id,
+                OAuthToken.is_active == True
+            ).update({"is_active": False})
         
         # Create new token
         token = OAuthToken(
             client_id=client.client_id,
             access_token=secrets.token_urlsafe(32),
             expires_at=datetime.utcnow() + timedelta(seconds=settings.oauth_token_expire_seconds),
-            scopes=json.dumps(scopes)
+            scopes=scopes_json
         )
         db.add(token)
-        db.commit()
+        db.flush()
         db.refresh(token)
+        OAuthService.remember_token_client(token)
         return token
     
     @staticmethod
+    def remember_token_client(token: OAuthToken) -> None:
+        """Map the token to its client in Redis so rate limits apply per client"""
+        try:
+            redis_client.set(
+                oauth_token_client_key(token.access_token),
+                token.client_id,
+                ex=max(OAuthService.get_expires_in(token), 1)
+            )
+        except RedisError as e:
+            # The limiter then falls back to the client IP; issuing must not fail over it
+            logger.warning("Failed to record OAuth token client: %s", e)
+    
+    @staticmethod
+    def get_expires_in(token: OAuthToken) -> int:
+        """Get remaining lifetime of a token in seconds"""
+        expires_at = token.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = expires_at - datetime.now(timezone.utc)
+        return max(int(remaining.total_seconds()), 0)
+    
+    @staticmethod
+    @traced()
     def validate_token(
         db: Session, 
         access_token: str
     ) -> Optional[OAuthToken]:
-        """Validate access token"""
-        token = db.query(OAuthToken).filter(
+        """Validate access token, loading its client and the client's user in the same query"""
+        token = db.query(OAuthToken).join(
+            OAuthToken.client
+        ).outerjoin(
+            OAuthClient.user
+        ).options(
+            contains_eager(OAuthToken.client).contains_eager(OAuthClient.user)
+        ).filter(
             OAuthToken.access_token == access_token,
             OAuthToken.is_active == True,
-            OAuthToken.expires_at > datetime.utcnow()
+            OAuthToken.expires_at > datetime.utcnow(),
+            OAuthClient.is_active == True
         ).first()
-        return token
\ No newline at end of file
+        return token
+    
+    @staticmethod
+    def cleanup_expired_tokens(db: Session, batch_size: int = 1000) -> int:
+        """Delete expired tokens in batches and return count of deleted tokens"""
+        return delete_in_batches(
+            db,
+            OAuthToken,
+            OAuthToken.expires_at < datetime.utcnow(),
+            batch_size=batch_size
+        )
\ No newline at end of file
@@ -1,15 +1,34 @@
+import logging
 import secrets
 import hashlib
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy import and_, bindparam, func, update
+from sqlalchemy.orm import Session, contains_eager
 from app.core.config import settings
+from app.core.database import delete_in_batches
+from app.core.security import redis_client
+from app.core.tracing import traced
 from app.models.user import User
 from app.models.personal_token import PersonalToken
 
+logger = logging.getLogger(__name__)
+
+# Write-behind buffer of token usage: uses and last use time per token id
+USAGE_COUNTS_KEY = "personal_token_usage:counts"
+USAGE_LAST_USED_KEY = "personal_token_usage:last_used"
+
 
 class PersonalTokenService:
     @staticmethod
+    def hash_token(token: str) -> str:
+        """Hash a plaintext token the way it is stored"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    @traced()
     def create_token(
         db: Session, 
         user: User, 
@@ -31,7 +50,7 @@ class PersonalTokenService:
         
         # Generate token
         token = secrets.token_urlsafe(64)
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        token_hash = PersonalTokenService.hash_token(token)
         
         # Set expiration
         expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
@@ -45,31 +64,94 @@ class PersonalTokenService:
         )
         
         db.add(personal_token)
-        db.commit()
+        db.flush()
         db.refresh(personal_token)
         
         return personal_token, token
     
     @staticmethod
+    @traced()
     def validate_token(db: Session, token: str) -> Optional[PersonalToken]:
-        """Validate a personal token and return the token object"""
+        """Validate a personal token, loading its user in the same query"""
         
         # Hash the token to compare with stored hash
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        token_hash = PersonalTokenService.hash_token(token)
         
-        # Find token in database
-        token_obj = db.query(PersonalToken).filter(
+        return db.query(PersonalToken).join(
+            PersonalToken.user
+        ).options(
+            contains_eager(PersonalToken.user)
+        ).filter(
             PersonalToken.token_hash == token_hash,
             PersonalToken.is_active == True,
             PersonalToken.expires_at > datetime.utcnow()
         ).first()
-        
-        if token_obj:
-            # Update last used timestamp
-            token_obj.last_used_at = datetime.utcnow()
+    
+    @staticmethod
+    def get_user_for_token(db: Session, token: str) -> Optional[User]:
+        """Validate a personal token, record its use and return the associated user"""
+        token_obj = PersonalTokenService.validate_token(db, token)
+        if not token_obj:
+            return None
+        PersonalTokenService.record_usage(token_obj.id)
+        return token_obj.user
+    
+    @staticmethod
+    def record_usage(token_id: str) -> None:
+        """Count a use of a token in Redis; `flush_usage` writes the counts to the database"""
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hincrby(USAGE_COUNTS_KEY, token_id, 1)
+            pipe.hset(USAGE_LAST_USED_KEY, token_id, time.time())
+            pipe.execute()
+        except RedisError as e:
+            # Usage statistics are best effort; authentication must not fail over them
+            logger.warning("Failed to record personal token usage: %s", e)
+    
+    @staticmethod
+    @traced()
+    def flush_usage(db: Session) -> int:
+        """Apply buffered usage to personal_tokens in one batch and return the number of tokens updated"""
+        
+        # Take the buffer and clear it atomically
+        pipe = redis_client.pipeline()
+        pipe.hgetall(USAGE_COUNTS_KEY)
+        pipe.hgetall(USAGE_LAST_USED_KEY)
+        pipe.delete(USAGE_COUNTS_KEY, USAGE_LAST_USED_KEY)
+        counts, last_used, _ = pipe.execute()
+        if not counts:
+            return 0
+        
+        now = time.time()
+        rows = [
+            {
+                "token_id": token_id,
+                "uses": int(uses),
+                "used_at": datetime.fromtimestamp(float(last_used.get(token_id, now)), timezone.utc),
+            }
+            # Fixed lock order against concurrent updates of the same tokens
+            for token_id, uses in sorted(counts.items())
+        ]
+        table = PersonalToken.__table__
+        stmt = update(table).where(
+            table.c.id == bindparam("token_id")
+        ).values(
+            request_count=table.c.request_count + bindparam("uses"),
+            last_used_at=func.greatest(table.c.last_used_at, bindparam("used_at"))
+        )
+        try:
+            db.execute(stmt, rows)
             db.commit()
-        
-        return token_obj
+        except Exception:
+            db.rollback()
+            # Return the usage to the buffer for the next flush
+            pipe = redis_client.pipeline(transaction=False)
+            for row in rows:
+                pipe.hincrby(USAGE_COUNTS_KEY, row["token_id"], row["uses"])
+                pipe.hsetnx(USAGE_LAST_USED_KEY, row["token_id"], row["used_at"].timestamp())
+            pipe.execute()
+            raise
+        return len(rows)
     
     @staticmethod
     def revoke_token(db: Session, token_id: str, user: User) -> bool:
@@ -85,7 +167,7 @@ class PersonalTokenService:
             return False
         
         token.is_active = False
-        db.commit()
+        db.flush()
         
         return True
     
@@ -99,44 +181,40 @@ class PersonalTokenService:
         ).order_by(PersonalToken.created_at.desc()).all()
     
     @staticmethod
-    def cleanup_expired_tokens(db: Session) -> int:
-        """Clean up expired tokens and return count of cleaned tokens"""
-        
-        expired_tokens = db.query(PersonalToken).filter(
-            PersonalToken.expires_at < datetime.utcnow()
-        ).all()
-        
-        count = len(expired_tokens)
-        
-        for token in expired_tokens:
-            token.is_active = False
-        
-        db.commit()
-        
-        return count
+    def cleanup_expired_tokens(db: Session, batch_size: int = 1000) -> int:
+        """Delete expired tokens in batches and return count of deleted tokens"""
+        
+        return delete_in_batches(
+            db,
+            PersonalToken,
+            PersonalToken.expires_at < datetime.utcnow(),
+            batch_size=batch_size
+        )
     
     @staticmethod
+    @traced()
     def get_token_usage_stats(db: Session, user: User) -> dict:
-        """Get usage statistics for a user's tokens"""
-        
-        active_tokens = db.query(PersonalToken).filter(
-            PersonalToken.user_id == user.id,
-            PersonalToken.is_active == True,
-            PersonalToken.expires_at > datetime.utcnow()
-        ).all()
-        
-        total_tokens = db.query(PersonalToken).filter(
+        """Get usage statistics for a user's tokens in a single aggregate query"""
+        
+        now = datetime.utcnow()
+        stats = db.query(
+            func.count().filter(and_(
+                PersonalToken.is_active == True,
+                PersonalToken.expires_at > now
+            )).label("active_tokens"),
+            func.count().label("total_tokens"),
+            func.count().filter(
+                PersonalToken.last_used_at > now - timedelta(days=7)
+            ).label("recently_used"),
+            func.coalesce(func.sum(PersonalToken.request_count), 0).label("total_requests")
+        ).filter(
             PersonalToken.user_id == user.id
-        ).count()
-        
-        recently_used = db.query(PersonalToken).filter(
-            PersonalToken.user_id == user.id,
-            PersonalToken.last_used_at > datetime.utcnow() - timedelta(days=7)
-        ).count()
+        ).one()
         
         return {
-            "active_tokens": len(active_tokens),
-            "total_tokens": total_tokens,
-            "recently_used": recently_used,
+            "active_tokens": stats.active_tokens,
+            "total_tokens": stats.total_tokens,
+            "recently_used": stats.recently_used,
+            "total_requests": int(stats.total_requests),
             "max_allowed": getattr(settings, 'max_personal_tokens_per_user', 10)
         }
\ No newline at end of file
@@ -1,17 +1,54 @@
+from functools import lru_cache
+from sqlalchemy import Row, Select, bindparam, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.todo import Todo
 from app.models.user import User
-from app.schemas.todo import TodoCreate, TodoUpdate
+from app.core.tracing import traced
+from app.schemas.todo import TODO_RESPONSE_FIELDS, TodoCreate, TodoUpdate
+
+
+@lru_cache(maxsize=128)
+def _todos_statement(fields: Tuple[str, ...]) -> Select:
+    """A user's todos projected onto `fields`, built once per projection"""
+    return select(*(getattr(Todo, field) for field in fields)).where(Todo.user_id == bindparam("user_id"))
+
+
+@lru_cache(maxsize=128)
+def _todo_statement(fields: Tuple[str, ...]) -> Select:
+    return _todos_statement(fields).where(Todo.id == bindparam("todo_id"))
 
 
 class TodoService:
     @staticmethod
+    @traced()
     def get_todos(db: Session, user: User) -> List[Todo]:
         """Get all todos for a user"""
         return db.query(Todo).filter(Todo.user_id == user.id).all()
+
+    @staticmethod
+    @traced()
+    def list_todos(db: Session, user: User, fields: Tuple[str, ...] = TODO_RESPONSE_FIELDS) -> List[Row]:
+        """Get all todos for a user as read-only rows of only `fields`.
+
+        Skips the identity map and per-instance ORM state; rows support
+        attribute access like `row.title`, so they serialize like Todo.
+        """
+        return db.execute(_todos_statement(fields), {"user_id": user.id}).all()
+
+    @staticmethod
+    @traced()
+    def get_todo_row(
+        db: Session,
+        todo_id: str,
+        user: User,
+        fields: Tuple[str, ...] = TODO_RESPONSE_FIELDS
+    ) -> Optional[Row]:
+        """Get a specific todo as a read-only row of only `fields`"""
+        return db.execute(_todo_statement(fields), {"user_id": user.id, "todo_id": todo_id}).first()
     
     @staticmethod
+    @traced()
     def get_todo_by_id(db: Session, todo_id: str, user: User) -> Optional[Todo]:
         """Get a specific todo by ID"""
         return db.query(Todo).filter(
@@ -20,6 +57,7 @@ class TodoService:
         ).first()
     
     @staticmethod
+    @traced()
     def create_todo(db: Session, todo: TodoCreate, user: User) -> Todo:
         """Create a new todo"""
         db_todo = Todo(
@@ -29,11 +67,12 @@ class TodoService:
             user_id=user.id
         )
         db.add(db_todo)
-        db.commit()
+        db.flush()
         db.refresh(db_todo)
         return db_todo
     
     @staticmethod
+    @traced()
     def update_todo(db: Session, todo_id: str, todo: TodoUpdate, user: User) -> Optional[Todo]:
         """Update an existing todo"""
         db_todo = db.query(Todo).filter(
@@ -52,11 +91,12 @@ class TodoService:
         if todo.completed is not None:
             db_todo.completed = todo.completed
         
-        db.commit()
+        db.flush()
         db.refresh(db_todo)
         return db_todo
     
     @staticmethod
+    @traced()
     def delete_todo(db: Session, todo_id: str, user: User) -> bool:
         """Delete a todo"""
         db_todo = db.query(Todo).filter(
@@ -68,5 +108,5 @@ class TodoService:
             return False
         
         db.delete(db_todo)
-        db.commit()
+        db.flush()
         return True
\ No newline at end of file
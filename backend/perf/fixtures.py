@@ -0,0 +1,80 @@
+"""Credentials for load tests, created directly in the local Postgres and Redis.
+
+Load-test users have google_id `loadtest-<n>` and are reused across runs.
+"""
+import json
+from typing import Any, Dict, List
+from app.core.database import SessionLocal
+from app.core.security import session_manager
+from app.models.oauth_client import OAuthClient
+from app.models.user import User
+from app.services.oauth_service import OAuthService
+from app.services.personal_token_service import PersonalTokenService
+
+LOADTEST_SCOPES = ["todos:read", "todos:write"]
+
+
+def _get_or_create_user(db, index: int) -> User:
+    google_id = f"loadtest-{index}"
+    user = db.query(User).filter(User.google_id == google_id).first()
+    if user:
+        return user
+    user = User(
+        google_id=google_id,
+        email=f"loadtest-{index}@example.com",
+        name=f"Load Test {index}"
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def prepare_principals(count: int) -> List[Dict[str, Any]]:
+    """Create one session, personal token and OAuth client per load-test user"""
+    db = SessionLocal()
+    principals = []
+    try:
+        for index in range(count):
+            user = _get_or_create_user(db, index)
+            session_id = session_manager.create_session(
+                {"id": user.id, "email": user.email, "name": user.name}
+            )
+            # Stay under the per-user token limit across repeated runs
+            for token in PersonalTokenService.list_tokens(db, user):
+                PersonalTokenService.revoke_token(db, token.id, user)
+            _, personal_token = PersonalTokenService.create_token(
+                db, user, f"loadtest-{index}", expires_in_days=1
+            )
+
+            client_name = f"loadtest-{index}"
+            oauth_client = db.query(OAuthClient).filter(
+                OAuthClient.client_name == client_name
+            ).first()
+            if not oauth_client:
+                oauth_client = OAuthService.create_client(db, client_name, LOADTEST_SCOPES, user)
+            elif oauth_client.user_id != user.id:
+                # Clients from runs before OAuth clients were bound to users
+                oauth_client.user_id = user.id
+            db.commit()
+
+            principals.append({
+                "user_id": user.id,
+                "session_id": session_id,
+                "personal_token": personal_token,
+                "client_id": oauth_client.client_id,
+                "client_secret": oauth_client.client_secret,
+            })
+    finally:
+        db.close()
+    return principals
+
+
+def revoke_principals(principals: List[Dict[str, Any]]) -> None:
+    """Delete load-test sessions; personal tokens expire on their own"""
+    for principal in principals:
+        session_manager.delete_session(principal["session_id"])
+
+
+if __name__ == "__main__":
+    print(json.dumps(prepare_principals(1), indent=2))
@@ -0,0 +1,197 @@
+"""Load generator for the todo and auth APIs.
+
+Run from the backend directory against a local stack:
+
+    python -m perf.loadtest browser --rate 200 --duration 30 --users 20
+
+With --rate the generator is open-loop: arrivals follow a Poisson process
+and latency is measured from each request's scheduled start, so a slow
+server cannot hide its queueing delay (no coordinated omission). With
+--rate 0 it runs closed-loop with --concurrency workers. Results are
+printed as JSON.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+import httpx
+from perf.scenarios import SCENARIOS, Scenario
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> Dict[str, Any]:
+    total = sum(statuses.values())
+    errors = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 500)
+    values = sorted(latencies)
+    return {
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "p50": round(percentile(values, 50) * 1000, 2),
+            "p95": round(percentile(values, 95) * 1000, 2),
+            "p99": round(percentile(values, 99) * 1000, 2),
+            "max": round(values[-1] * 1000, 2) if values else 0.0,
+        },
+    }
+
+
+class LoadTest:
+    def __init__(
+        self,
+        scenario: Scenario,
+        principals: List[Dict[str, Any]],
+        base_url: str,
+        rate: float,
+        duration: float,
+        concurrency: int,
+        seed: int
+    ):
+        self.scenario = scenario
+        self.principals = principals
+        self.base_url = base_url
+        self.rate = rate
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.states = [
+            {"todo_ids": [], "rng": random.Random(seed + index)}
+            for index in range(len(principals))
+        ]
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.dropped = 0
+
+    async def _issue_access_tokens(self, client: httpx.AsyncClient) -> None:
+        for principal in self.principals:
+            response = await client.post(
+                "/api/v1/oauth/token",
+                auth=(principal["client_id"], principal["client_secret"]),
+                json={"grant_type": "client_credentials", "scope": "todos:read todos:write"}
+            )
+            response.raise_for_status()
+            principal["access_token"] = response.json()["access_token"]
+
+    async def _one(self, client: httpx.AsyncClient, scheduled: float) -> None:
+        index = self.rng.randrange(len(self.principals))
+        name, operation = self.scenario.pick(self.rng)
+        try:
+            response = await operation(client, self.principals[index], self.states[index])
+            status = str(response.status_code)
+        except httpx.HTTPError:
+            status = "error"
+        self.latencies[name].append(time.perf_counter() - scheduled)
+        self.statuses[name][status] += 1
+
+    async def _open_loop(self, client: httpx.AsyncClient, deadline: float) -> None:
+        in_flight = set()
+        next_arrival = time.perf_counter()
+        while next_arrival < deadline:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.concurrency:
+                # Client-side saturation: the arrival is lost, not delayed
+                self.dropped += 1
+            else:
+                task = asyncio.create_task(self._one(client, next_arrival))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_arrival += self.rng.expovariate(self.rate)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def _closed_loop(self, client: httpx.AsyncClient, deadline: float) -> None:
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._one(client, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def run(self) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=30) as client:
+            if self.scenario.name == "mcp_oauth":
+                await self._issue_access_tokens(client)
+
+            start = time.perf_counter()
+            deadline = start + self.duration
+            if self.rate > 0:
+                await self._open_loop(client, deadline)
+            else:
+                await self._closed_loop(client, deadline)
+            elapsed = time.perf_counter() - start
+
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        all_statuses = sum(self.statuses.values(), Counter())
+        result = {
+            "scenario": self.scenario.name,
+            "config": {
+                "base_url": self.base_url,
+                "rate": self.rate,
+                "duration": self.duration,
+                "concurrency": self.concurrency,
+                "users": len(self.principals),
+            },
+            "dropped": self.dropped,
+            **summarize(all_latencies, all_statuses, elapsed),
+            "operations": {
+                name: summarize(self.latencies[name], self.statuses[name], elapsed)
+                for name in sorted(self.latencies)
+            },
+        }
+        return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=50, help="arrivals per second, 0 for closed loop")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=100, help="max in-flight requests")
+    parser.add_argument("--users", type=int, default=10, help="distinct principals")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    from perf.fixtures import prepare_principals, revoke_principals
+
+    principals = prepare_principals(args.users)
+    try:
+        result = asyncio.run(LoadTest(
+            SCENARIOS[args.scenario],
+            principals,
+            args.base_url,
+            args.rate,
+            args.duration,
+            args.concurrency,
+            args.seed
+        ).run())
+    finally:
+        revoke_principals(principals)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""Microbenchmarks for the per-request CPU work.
+
+    python -m perf.microbench run --output perf-baseline.json
+    python -m perf.microbench compare perf-baseline.json --threshold 0.25
+
+Each benchmark is timed in-process without Postgres or Redis: ORM rows are
+transient `Todo` instances and cached payloads are built the way the app
+writes them. `run` prints or saves the results as JSON; `compare` reruns the
+benchmarks present in a baseline and exits non-zero when any median is more
+than --threshold slower. Baselines are machine-specific, so compare against
+one recorded on the same host.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.api.responses import ORJSONResponse
+from app.models.todo import Todo
+from app.schemas.todo import TodoResponse, serialize_todos
+from app.services.personal_token_service import PersonalTokenService
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function returning the callable to time"""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def make_todos(count: int) -> List[Todo]:
+    created_at = datetime(2026, 1, 1)
+    user_id = str(uuid.uuid4())
+    return [
+        Todo(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            title=f"Todo {index}",
+            description="Pick up groceries and call the dentist" if index % 2 else None,
+            completed=index % 3 == 0,
+            created_at=created_at,
+            updated_at=created_at + timedelta(hours=1) if index % 3 == 0 else None,
+        )
+        for index in range(count)
+    ]
+
+
+def _from_orm(count: int):
+    def setup():
+        todos = make_todos(count)
+        return lambda: [TodoResponse.from_orm(todo) for todo in todos]
+    return setup
+
+
+for _count in (1, 100, 10_000):
+    benchmark(f"todo_from_orm_{_count}")(_from_orm(_count))
+
+
+def run_coroutine(coro) -> Any:
+    """Drive a coroutine that never suspends, without event loop overhead"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def _response_model(count: int):
+    """What FastAPI does with the router's return value for response_model=List[TodoResponse]"""
+    def setup():
+        field = create_response_field("Response_get_todos", List[TodoResponse], mode="serialization")
+        content = [TodoResponse.from_orm(todo) for todo in make_todos(count)]
+        return lambda: run_coroutine(serialize_response(field=field, response_content=content))
+    return setup
+
+
+for _count in (100, 10_000):
+    benchmark(f"todo_response_model_{_count}")(_response_model(_count))
+
+
+def _list_legacy(count: int):
+    """Pre-orjson list path: from_orm per row, response_model revalidation, stdlib json"""
+    def setup():
+        field = create_response_field("Response_get_todos", List[TodoResponse], mode="serialization")
+        todos = make_todos(count)
+
+        def serialize():
+            content = [TodoResponse.from_orm(todo) for todo in todos]
+            return JSONResponse(run_coroutine(serialize_response(field=field, response_content=content))).body
+        return serialize
+    return setup
+
+
+def _list_orjson(count: int, validate: bool):
+    def setup():
+        todos = make_todos(count)
+        return lambda: ORJSONResponse(serialize_todos(todos, validate=validate)).body
+    return setup
+
+
+for _count in (1000, 10_000):
+    benchmark(f"todo_list_legacy_{_count}")(_list_legacy(_count))
+    benchmark(f"todo_list_orjson_{_count}")(_list_orjson(_count, validate=False))
+    benchmark(f"todo_list_orjson_validated_{_count}")(_list_orjson(_count, validate=True))
+
+
+@benchmark("session_json_loads")
+def _session_json_loads():
+    payload = json.dumps({
+        "user_id": str(uuid.uuid4()),
+        "email": "someone@example.com",
+        "name": "Some One",
+        "created_at": datetime(2026, 1, 1).isoformat(),
+    })
+    return lambda: json.loads(payload)
+
+
+@benchmark("personal_token_hash")
+def _personal_token_hash():
+    token = "x" * 86  # length of secrets.token_urlsafe(64)
+    return lambda: PersonalTokenService.hash_token(token)
+
+
+@benchmark("oauth_scope_parse")
+def _oauth_scope_parse():
+    """Scope handling in the /oauth/token route"""
+    client_scopes = json.dumps(["todos:read", "todos:write"])
+    requested = "todos:read todos:write"
+
+    def parse():
+        requested_scopes = requested.split()
+        allowed_scopes = json.loads(client_scopes)
+        return all(scope in allowed_scopes for scope in requested_scopes)
+    return parse
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    """Median and min seconds per call over `repeat` timed batches"""
+    func()  # warm up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        "loops": loops,
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "min_us": round(min(samples) * 1e6, 3),
+    }
+
+
+def run(names: List[str], repeat: int, min_time: float) -> Dict[str, Any]:
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](), repeat, min_time)
+        print(f"{name}: {results[name]['median_us']} us", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created_at": datetime.utcnow().isoformat(),
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Return the benchmarks whose median regressed beyond threshold"""
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"][name]["median_us"]
+        after = result["median_us"]
+        change = (after - before) / before if before else 0.0
+        result["baseline_median_us"] = before
+        result["change"] = round(change, 4)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _select(patterns: Optional[List[str]]) -> List[str]:
+    if not patterns:
+        return list(BENCHMARKS)
+    return [name for name in BENCHMARKS if any(pattern in name for pattern in patterns)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["run", "compare", "list"])
+    parser.add_argument("baseline", nargs="?", help="baseline JSON for compare")
+    parser.add_argument("-k", dest="patterns", action="append", help="only benchmarks containing this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed batch")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.mode == "list":
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    names = _select(args.patterns)
+    baseline = None
+    if args.mode == "compare":
+        if not args.baseline:
+            parser.error("compare needs a baseline file")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        names = [name for name in names if name in baseline["benchmarks"]]
+
+    result = run(names, args.repeat, args.min_time)
+    regressions = compare(baseline, result, args.threshold) if baseline else []
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for name in regressions:
+        change = result["benchmarks"][name]["change"]
+        print(f"REGRESSION {name}: {change:+.1%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
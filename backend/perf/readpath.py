@@ -0,0 +1,93 @@
+"""Compare the ORM and lean todo list read paths on the largest accounts.
+
+    python -m perf.readpath --accounts 3 --repeat 20
+
+For each account, times TodoService.get_todos (ORM instances) and
+TodoService.list_todos (Core rows) from query to JSON body, and measures
+peak Python memory per row with tracemalloc. Needs a seeded database, see
+perf.seed.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+from sqlalchemy import func, select
+from app.api.responses import ORJSONResponse
+from app.core.database import SessionLocal
+from app.models.todo import Todo
+from app.models.user import User
+from app.schemas.todo import serialize_todos
+from app.services.todo_service import TodoService
+
+READ_PATHS: Dict[str, Callable] = {
+    "orm": TodoService.get_todos,
+    "lean": TodoService.list_todos,
+}
+
+
+def measure(read: Callable, user: User, repeat: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            rows = read(db, user)
+            ORJSONResponse(serialize_todos(rows))
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        rows = read(db, user)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+
+    return {
+        "rows": len(rows),
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+        "peak_bytes_per_row": round(peak / len(rows)) if rows else 0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=3, help="largest accounts to measure")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = db.execute(
+            select(Todo.user_id).group_by(Todo.user_id).order_by(func.count().desc()).limit(args.accounts)
+        ).scalars().all()
+        users = [db.get(User, user_id) for user_id in user_ids]
+        db.expunge_all()
+    finally:
+        db.close()
+
+    results = []
+    for user in users:
+        result = {"user_id": user.id}
+        for name, read in READ_PATHS.items():
+            result[name] = measure(read, user, args.repeat)
+        results.append(result)
+        print(
+            f"{result['orm']['rows']} rows: orm {result['orm']['median_ms']} ms, "
+            f"lean {result['lean']['median_ms']} ms",
+            file=sys.stderr
+        )
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
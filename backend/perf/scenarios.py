@@ -0,0 +1,105 @@
+"""Load-test scenarios.
+
+A scenario is a weighted mix of operations run on behalf of one principal.
+Each operation is an async callable taking (client, principal, state) and
+returning the response; `state` is per-principal and holds created todo ids
+and a seeded RNG.
+"""
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import httpx
+
+Operation = Callable[[httpx.AsyncClient, Dict[str, Any], Dict[str, Any]], Awaitable[httpx.Response]]
+
+
+class Scenario:
+    def __init__(self, name: str, description: str, operations: List[Tuple[str, float, Operation]]):
+        self.name = name
+        self.description = description
+        self.operations = operations
+        self._names = [name for name, _, _ in operations]
+        self._weights = [weight for _, weight, _ in operations]
+
+    def pick(self, rng: random.Random) -> Tuple[str, Operation]:
+        index = rng.choices(range(len(self.operations)), weights=self._weights)[0]
+        return self._names[index], self.operations[index][2]
+
+
+def _auth(principal: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    if mode == "session":
+        return {"cookies": {"session_id": principal["session_id"]}}
+    if mode == "personal":
+        return {"headers": {"Authorization": f"Bearer {principal['personal_token']}"}}
+    return {"headers": {"Authorization": f"Bearer {principal['access_token']}"}}
+
+
+def _todo_operations(prefix: str, mode: str) -> List[Tuple[str, float, Operation]]:
+    async def list_todos(client, principal, state):
+        return await client.get(f"{prefix}/", **_auth(principal, mode))
+
+    async def get_todo(client, principal, state):
+        todo_id = state["rng"].choice(state["todo_ids"]) if state["todo_ids"] else "missing"
+        return await client.get(f"{prefix}/{todo_id}", **_auth(principal, mode))
+
+    async def create_todo(client, principal, state):
+        response = await client.post(
+            f"{prefix}/",
+            json={"title": "Load test todo", "description": "Created by perf.loadtest"},
+            **_auth(principal, mode)
+        )
+        if response.status_code == 200:
+            state["todo_ids"].append(response.json()["id"])
+        return response
+
+    async def update_todo(client, principal, state):
+        todo_id = state["rng"].choice(state["todo_ids"]) if state["todo_ids"] else "missing"
+        return await client.put(
+            f"{prefix}/{todo_id}", json={"completed": True}, **_auth(principal, mode)
+        )
+
+    async def delete_todo(client, principal, state):
+        todo_id = state["todo_ids"].pop() if state["todo_ids"] else "missing"
+        return await client.delete(f"{prefix}/{todo_id}", **_auth(principal, mode))
+
+    return [
+        ("list", 60, list_todos),
+        ("get", 15, get_todo),
+        ("create", 12, create_todo),
+        ("update", 8, update_todo),
+        ("delete", 5, delete_todo),
+    ]
+
+
+async def _issue_token(client, principal, state):
+    return await client.post(
+        "/api/v1/oauth/token",
+        auth=(principal["client_id"], principal["client_secret"]),
+        json={"grant_type": "client_credentials", "scope": "todos:read todos:write"}
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            "browser",
+            "Browser session users on /api/v1/todos",
+            _todo_operations("/api/v1/todos", "session"),
+        ),
+        Scenario(
+            "mcp_personal",
+            "MCP agents with personal tokens on /api/v1/personal-todos",
+            _todo_operations("/api/v1/personal-todos", "personal"),
+        ),
+        Scenario(
+            "mcp_oauth",
+            "MCP agents with OAuth tokens on /api/v1/oauth-todos",
+            _todo_operations("/api/v1/oauth-todos", "oauth"),
+        ),
+        Scenario(
+            "token_burst",
+            "Token issuance bursts on /api/v1/oauth/token",
+            [("issue", 1, _issue_token)],
+        ),
+    ]
+}
@@ -0,0 +1,284 @@
+"""Seed the database with a large synthetic dataset using COPY.
+
+    python -m perf.seed --users 100000 --todos 10000000 --truncate
+
+Todo counts per user follow a Zipf distribution, so a few heavy accounts
+own most of the rows like real service accounts do. Output is
+deterministic for a given --seed. Personal tokens are derived from the
+user index and token number (see `seed_personal_token`) and have the shape
+of real ones; their plaintext is written to --manifest together with the
+OAuth client credentials, for use by benchmarks.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterator, List, Sequence, Tuple
+from app.core.database import engine, init_schema
+from app.models import user, todo, oauth_client, oauth_token, personal_token  # noqa: F401
+
+CHUNK_ROWS = 100_000
+WORDS = (
+    "buy call email write review plan fix ship book pay clean read send update "
+    "prepare schedule renew cancel check draft order organize backup migrate "
+    "groceries report invoice dentist meeting slides budget release taxes garden "
+    "car insurance flight hotel docs tests deploy contract newsletter birthday"
+).split()
+NOW = datetime(2026, 1, 1)
+
+
+def zipf_counts(total: int, buckets: int, exponent: float, rng: random.Random) -> List[int]:
+    """Split total into per-bucket counts following a Zipf distribution"""
+    weights = [1 / (rank ** exponent) for rank in range(1, buckets + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in range(total - sum(counts)):
+        counts[index % buckets] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _token(rng: random.Random, nbytes: int) -> str:
+    return base64.urlsafe_b64encode(rng.getrandbits(nbytes * 8).to_bytes(nbytes, "big")).rstrip(b"=").decode()
+
+
+def seed_personal_token(index: int, n: int) -> str:
+    """Plaintext of seeded personal token n of user index.
+
+    64 bytes, URL-safe base64 without padding: the same length and alphabet
+    as `secrets.token_urlsafe(64)`, so shape-based dispatch accepts it.
+    """
+    digest = hashlib.sha512(f"seed-pat-{index}-{n}".encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _timestamp(rng: random.Random, max_days: int = 730) -> datetime:
+    return NOW - timedelta(seconds=rng.randrange(max_days * 86400))
+
+
+def _copy(table: str, columns: Sequence[str], rows: Iterator[Tuple]) -> int:
+    """COPY rows into a table in chunks and return the row count"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        buffer = io.StringIO()
+        pending = 0
+        for row in rows:
+            buffer.write("\t".join("\\N" if value is None else str(value) for value in row))
+            buffer.write("\n")
+            pending += 1
+            if pending == CHUNK_ROWS:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                total += pending
+                buffer = io.StringIO()
+                pending = 0
+        if pending:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            total += pending
+        connection.commit()
+    finally:
+        connection.close()
+    return total
+
+
+def _users(user_ids: List[str], rng: random.Random) -> Iterator[Tuple]:
+    for index, user_id in enumerate(user_ids):
+        yield (
+            user_id,
+            f"seed-{index}",
+            f"seed-{index}@example.com",
+            f"Seed User {index}",
+            None,
+            True,
+            _timestamp(rng),
+        )
+
+
+def _todos(user_ids: List[str], counts: List[int], completed_ratio: float, rng: random.Random) -> Iterator[Tuple]:
+    for user_id, count in zip(user_ids, counts):
+        for _ in range(count):
+            created_at = _timestamp(rng)
+            completed = rng.random() < completed_ratio
+            roll = rng.random()
+            if roll < 0.4:
+                description = None
+            elif roll < 0.99:
+                description = " ".join(rng.choices(WORDS, k=rng.randint(5, 30)))
+            else:
+                # Occasional long notes exercise the Text column
+                description = " ".join(rng.choices(WORDS, k=rng.randint(100, 400)))
+            yield (
+                _uuid(rng),
+                user_id,
+                " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+                description,
+                completed,
+                created_at,
+                created_at + timedelta(hours=rng.randint(1, 240)) if completed else None,
+            )
+
+
+def _personal_tokens(user_ids: List[str], per_user: int, rng: random.Random, manifest: list) -> Iterator[Tuple]:
+    for index, user_id in enumerate(user_ids):
+        for n in range(per_user):
+            plain = seed_personal_token(index, n)
+            expired = rng.random() < 0.3
+            expires_at = NOW - timedelta(days=rng.randint(1, 90)) if expired else NOW + timedelta(days=3650)
+            row = (
+                _uuid(rng),
+                f"token {n}",
+                hashlib.sha256(plain.encode()).hexdigest(),
+                user_id,
+                expires_at,
+                _timestamp(rng, 30) if rng.random() < 0.5 else None,
+                rng.randint(0, 10_000),
+                rng.random() > 0.1,
+                _timestamp(rng),
+            )
+            # Only tokens that authenticate: unexpired and active
+            if not expired and row[7] and len(manifest) < 1000:
+                manifest.append({"user_id": user_id, "personal_token": plain})
+            yield row
+
+
+def _oauth_clients(
+    client_ids: List[str], user_ids: List[str], rng: random.Random, manifest: list
+) -> Iterator[Tuple]:
+    for index, client_id in enumerate(client_ids):
+        client_secret = _token(rng, 64)
+        if len(manifest) < 1000:
+            manifest.append({"client_id": client_id, "client_secret": client_secret})
+        yield (
+            _uuid(rng),
+            client_id,
+            client_secret,
+            f"Seed Client {index}",
+            json.dumps(["todos:read", "todos:write"]),
+            user_ids[index % len(user_ids)],
+            True,
+            _timestamp(rng),
+        )
+
+
+def _oauth_tokens(client_ids: List[str], per_client: int, rng: random.Random) -> Iterator[Tuple]:
+    scopes = json.dumps(["todos:read", "todos:write"])
+    for client_id in client_ids:
+        for n in range(per_client):
+            # Most historical tokens are expired; the newest one is live
+            live = n == per_client - 1
+            expires_at = NOW + timedelta(days=3650) if live else NOW - timedelta(hours=rng.randint(1, 24 * 90))
+            yield (
+                _uuid(rng),
+                client_id,
+                _token(rng, 32),
+                "Bearer",
+                expires_at,
+                scopes,
+                live,
+                expires_at - timedelta(hours=1),
+            )
+
+
+def seed(args) -> dict:
+    rng = random.Random(args.seed)
+    init_schema(engine)
+
+    if args.truncate:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "TRUNCATE todos, personal_tokens, oauth_tokens, oauth_clients, users"
+            )
+
+    timings = {}
+    manifest = {"personal_tokens": [], "oauth_clients": []}
+
+    def timed(name, func):
+        start = time.perf_counter()
+        rows = func()
+        timings[name] = {"rows": rows, "seconds": round(time.perf_counter() - start, 2)}
+        print(f"{name}: {rows} rows in {timings[name]['seconds']}s", file=sys.stderr)
+
+    user_ids = [_uuid(rng) for _ in range(args.users)]
+    counts = zipf_counts(args.todos, args.users, args.zipf, rng)
+    client_ids = [_token(rng, 32) for _ in range(args.oauth_clients)]
+
+    timed("users", lambda: _copy(
+        "users",
+        ["id", "google_id", "email", "name", "avatar_url", "is_active", "created_at"],
+        _users(user_ids, rng)
+    ))
+    timed("todos", lambda: _copy(
+        "todos",
+        ["id", "user_id", "title", "description", "completed", "created_at", "updated_at"],
+        _todos(user_ids, counts, args.completed_ratio, rng)
+    ))
+    timed("personal_tokens", lambda: _copy(
+        "personal_tokens",
+        ["id", "name", "token_hash", "user_id", "expires_at", "last_used_at",
+         "request_count", "is_active", "created_at"],
+        _personal_tokens(user_ids, args.personal_tokens, rng, manifest["personal_tokens"])
+    ))
+    timed("oauth_clients", lambda: _copy(
+        "oauth_clients",
+        ["id", "client_id", "client_secret", "client_name", "scopes", "user_id", "is_active", "created_at"],
+        _oauth_clients(client_ids, user_ids, rng, manifest["oauth_clients"])
+    ))
+    timed("oauth_tokens", lambda: _copy(
+        "oauth_tokens",
+        ["id", "client_id", "access_token", "token_type", "expires_at", "scopes",
+         "is_active", "created_at"],
+        _oauth_tokens(client_ids, args.oauth_tokens, rng)
+    ))
+
+    if not args.skip_analyze:
+        start = time.perf_counter()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("ANALYZE")
+        timings["analyze"] = {"seconds": round(time.perf_counter() - start, 2)}
+
+    if args.manifest:
+        with open(args.manifest, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    return {
+        "seed": args.seed,
+        "heaviest_user_todos": max(counts) if counts else 0,
+        "timings": timings,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of todos per user")
+    parser.add_argument("--completed-ratio", type=float, default=0.4)
+    parser.add_argument("--personal-tokens", type=int, default=2, help="per user")
+    parser.add_argument("--oauth-clients", type=int, default=100)
+    parser.add_argument("--oauth-tokens", type=int, default=20, help="per client, all but one expired")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="empty all tables first")
+    parser.add_argument("--skip-analyze", action="store_true")
+    parser.add_argument("--manifest", help="write seeded credentials here as JSON")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(seed(args), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
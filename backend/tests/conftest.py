@@ -0,0 +1,143 @@
+"""Fixtures for tests that run the app against local Postgres and Redis.
+
+Tests are skipped when either service is unreachable. Point DATABASE_URL and
+REDIS_URL at disposable instances; fixtures create and delete their own rows.
+"""
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List
+import pytest
+from sqlalchemy import event, text
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.core.database import engine
+    from app.core.security import redis_client
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        redis_client.ping()
+    except Exception as exc:
+        pytest.skip(f"Postgres/Redis not available: {exc}")
+
+    from app.core.database import init_schema
+    from app.main import app as fastapi_app
+
+    init_schema()
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(app):
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    from app.models.todo import Todo
+    from app.models.personal_token import PersonalToken
+    from app.models.user import User
+
+    suffix = uuid.uuid4().hex[:12]
+    test_user = User(
+        google_id=f"test-{suffix}",
+        email=f"test-{suffix}@example.com",
+        name="Test User"
+    )
+    db.add(test_user)
+    db.commit()
+    db.refresh(test_user)
+    yield test_user
+
+    db.rollback()
+    db.query(Todo).filter(Todo.user_id == test_user.id).delete()
+    db.query(PersonalToken).filter(PersonalToken.user_id == test_user.id).delete()
+    db.delete(test_user)
+    db.commit()
+
+
+@pytest.fixture
+def session_cookies(user):
+    from app.core.security import session_manager
+
+    session_id = session_manager.create_session(
+        {"id": user.id, "email": user.email, "name": user.name}
+    )
+    yield {"session_id": session_id}
+    session_manager.delete_session(session_id)
+
+
+@pytest.fixture
+def personal_headers(db, user):
+    from app.services.personal_token_service import PersonalTokenService
+
+    _, token = PersonalTokenService.create_token(db, user, "test")
+    db.commit()
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def oauth_headers(db, user):
+    from app.models.oauth_client import OAuthClient
+    from app.models.oauth_token import OAuthToken
+    from app.services.oauth_service import OAuthService
+
+    oauth_client = OAuthService.create_client(db, "test", ["todos:read", "todos:write"], user)
+    token = OAuthService.generate_token(db, oauth_client, ["todos:read", "todos:write"])
+    db.commit()
+    yield {"Authorization": f"Bearer {token.access_token}"}
+
+    db.rollback()
+    db.query(OAuthToken).filter(OAuthToken.client_id == oauth_client.client_id).delete()
+    db.query(OAuthClient).filter(OAuthClient.client_id == oauth_client.client_id).delete()
+    db.commit()
+
+
+@pytest.fixture
+def assert_max_queries(app):
+    """Fail when the block executes more SQL statements than allowed.
+
+    Usage::
+
+        with assert_max_queries(2):
+            client.get("/api/v1/todos/", cookies=session_cookies)
+    """
+    from app.core.database import engines
+
+    @contextmanager
+    def _assert_max_queries(limit: int) -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for engine in engines.values():
+            event.listen(engine, "after_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines.values():
+                event.remove(engine, "after_cursor_execute", record)
+
+        assert len(statements) <= limit, (
+            f"{len(statements)} queries executed, budget is {limit}:\n"
+            + "\n".join(statements)
+        )
+
+    return _assert_max_queries
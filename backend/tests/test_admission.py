@@ -0,0 +1,78 @@
+"""Admission controller queueing, without the app or any backing services."""
+import asyncio
+from app.core.admission import BULK, INTERACTIVE, AdmissionController
+
+
+def make_controller(**kwargs) -> AdmissionController:
+    options = dict(
+        initial_limit=10,
+        min_limit=10,
+        max_limit=10,
+        queue_size=10,
+        queue_timeout=0.2,
+        latency_target=1.0,
+        interactive_reserve=0.2,
+    )
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+async def saturate_bulk(controller: AdmissionController, in_flight: int) -> asyncio.Task:
+    """Admit `in_flight` bulk requests and leave one more waiting in the queue"""
+    for _ in range(in_flight):
+        assert await controller.acquire(BULK) is None
+    waiter = asyncio.create_task(controller.acquire(BULK))
+    await asyncio.sleep(0)
+    assert controller.class_queued[BULK] == 1
+    return waiter
+
+
+def test_interactive_uses_reserve_past_queued_bulk():
+    async def scenario():
+        controller = make_controller()
+        # Bulk may use 8 of 10 slots; the other two are reserved
+        waiter = await saturate_bulk(controller, 8)
+        result = await asyncio.wait_for(controller.acquire(INTERACTIVE), 0.05)
+        assert result is None
+        assert controller.class_in_flight[INTERACTIVE] == 1
+        waiter.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_read_admitted_while_bulk_is_at_class_limit():
+    async def scenario():
+        controller = make_controller(class_limits={BULK: 4})
+        waiter = await saturate_bulk(controller, 4)
+        for _ in range(6):
+            assert await asyncio.wait_for(controller.acquire(INTERACTIVE), 0.05) is None
+        assert controller.in_flight == 10
+
+        # Once bulk is under both its class limit and the interactive
+        # reserve again, the queued bulk request is admitted
+        controller.release(BULK, 0.01)
+        controller.release(INTERACTIVE, 0.01)
+        assert not waiter.done()
+        controller.release(INTERACTIVE, 0.01)
+        assert await waiter is None
+        assert controller.class_in_flight[BULK] == 4
+
+    asyncio.run(scenario())
+
+
+def test_interactive_queues_behind_interactive():
+    async def scenario():
+        controller = make_controller()
+        for _ in range(10):
+            assert await controller.acquire(INTERACTIVE) is None
+        first = asyncio.create_task(controller.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(controller.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+
+        controller.release(INTERACTIVE, 0.01)
+        assert await first is None
+        assert not second.done()
+        second.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+"""Response compression negotiation, without the app or any backing services."""
+import asyncio
+import gzip
+from app.core.compression import CompressionMiddleware
+
+
+def send_request(middleware, accept_encoding, path="/"):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    headers = [(b"accept-encoding", accept_encoding)] if accept_encoding else []
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers}
+    asyncio.run(middleware(scope, receive, send))
+    return dict(messages[0]["headers"]), messages[1]["body"]
+
+
+def run_request(accept_encoding, content_type, body):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    middleware = CompressionMiddleware(app, minimum_size=100, cache_entries=0)
+    return send_request(middleware, accept_encoding)[0]
+
+
+def test_compressible_responses_vary_on_accept_encoding():
+    large = b"[" + b'{"title": "todo"},' * 100 + b"{}]"
+
+    headers = run_request(b"gzip", b"application/json", large)
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+
+    # Sent unencoded, but a cache must not hand this to a gzip client or back
+    for accept_encoding, body in ((None, large), (b"gzip", b"[]")):
+        headers = run_request(accept_encoding, b"application/json", body)
+        assert b"content-encoding" not in headers
+        assert headers[b"vary"] == b"Accept-Encoding"
+
+    headers = run_request(b"gzip", b"image/png", large)
+    assert b"vary" not in headers
+
+
+def test_cached_variants_of_a_shared_etag_stay_per_path():
+    bodies = {"/a": b'{"todo": "a"}' * 20, "/b": b'{"todo": "b"}' * 20}
+
+    async def app(scope, receive, send):
+        body = bodies[scope["path"]]
+        headers = [(b"content-type", b"application/json"), (b"etag", b'"1"')]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    middleware = CompressionMiddleware(app, minimum_size=100, cache_entries=8)
+    for path, body in (*bodies.items(), *bodies.items()):
+        _, compressed = send_request(middleware, b"gzip", path)
+        assert gzip.decompress(compressed) == body
@@ -0,0 +1,187 @@
+"""Google login against a local stand-in for Google's token and JWKS endpoints."""
+import asyncio
+import time
+import uuid
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from app.core.google_oauth import (
+    GOOGLE_JWKS_URL,
+    GOOGLE_TOKEN_URL,
+    GoogleOAuthClient,
+    InvalidIdToken,
+)
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+class FakeGoogle:
+    """Signs ID tokens with a rotating RSA key and serves the OAuth endpoints"""
+
+    def __init__(self):
+        self.requests = []
+        self.keys = {}
+        self.callback_sub = "google-user"
+        self.rotate()
+
+    def rotate(self) -> str:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = uuid.uuid4().hex
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        self.keys = {self.kid: {**jwk.construct(public_pem, "RS256").to_dict(), "kid": self.kid}}
+        return self.kid
+
+    def id_token(self, kid=None, **claims) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "google-" + uuid.uuid4().hex[:12],
+            "email": "someone@example.com",
+            "email_verified": True,
+            "name": "Someone",
+            "iat": now,
+            "exp": now + 3600,
+            **claims,
+        }
+        return jwt.encode(payload, self.private_pem, algorithm="RS256", headers={"kid": kid or self.kid})
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.requests.append(url)
+        if url == GOOGLE_JWKS_URL:
+            return httpx.Response(
+                200,
+                json={"keys": list(self.keys.values())},
+                headers={"Cache-Control": "public, max-age=21600"},
+            )
+        if url == GOOGLE_TOKEN_URL:
+            return httpx.Response(200, json={
+                "access_token": "ya29.test",
+                "id_token": self.id_token(sub=self.callback_sub, email=f"{self.callback_sub}@example.com"),
+                "token_type": "Bearer",
+                "expires_in": 3599,
+            })
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def google():
+    return FakeGoogle()
+
+
+def make_client(google: FakeGoogle, **kwargs) -> GoogleOAuthClient:
+    http = httpx.AsyncClient(transport=httpx.MockTransport(google.handle))
+    return GoogleOAuthClient(http, CLIENT_ID, "secret", "http://localhost:3000/auth/callback", **kwargs)
+
+
+def test_signing_keys_are_cached(google):
+    client = make_client(google)
+
+    async def verify_twice():
+        first = await client.verify_id_token(google.id_token(sub="a"))
+        second = await client.verify_id_token(google.id_token(sub="b"))
+        return first, second
+
+    first, second = asyncio.run(verify_twice())
+    assert (first["sub"], second["sub"]) == ("a", "b")
+    assert google.requests == [GOOGLE_JWKS_URL]
+
+
+def test_rotated_key_is_fetched(google):
+    # No refetch floor, as if the rotation came a while after the first fetch
+    client = make_client(google, jwks_min_refresh_seconds=0)
+
+    async def verify_across_rotation():
+        await client.verify_id_token(google.id_token())
+        google.rotate()
+        return await client.verify_id_token(google.id_token(sub="rotated"))
+
+    assert asyncio.run(verify_across_rotation())["sub"] == "rotated"
+    assert google.requests == [GOOGLE_JWKS_URL, GOOGLE_JWKS_URL]
+
+
+def test_unknown_key_refetch_is_throttled(google):
+    client = make_client(google)
+
+    async def verify_forged():
+        await client.verify_id_token(google.id_token())
+        for _ in range(3):
+            with pytest.raises(InvalidIdToken):
+                await client.verify_id_token(google.id_token(kid="forged"))
+
+    asyncio.run(verify_forged())
+    assert google.requests == [GOOGLE_JWKS_URL]
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "someone-else"},
+    {"iss": "https://evil.example.com"},
+    {"exp": int(time.time()) - 3600},
+])
+def test_invalid_claims_are_rejected(google, claims):
+    client = make_client(google)
+    with pytest.raises(InvalidIdToken):
+        asyncio.run(client.verify_id_token(google.id_token(**claims)))
+
+
+def test_callback_skips_userinfo(app, client, db, google):
+    from app.models.user import User
+
+    google.callback_sub = "test-" + uuid.uuid4().hex[:12]
+    original = app.state.google_client
+    app.state.google_client = make_client(google)
+    try:
+        response = client.get("/api/v1/auth/google/callback", params={"code": "auth-code"})
+    finally:
+        app.state.google_client = original
+
+    try:
+        assert response.status_code == 200
+        assert response.json()["email"] == f"{google.callback_sub}@example.com"
+        assert "session_id" in response.cookies
+        # One token exchange plus the first JWKS fetch; no userinfo request
+        assert google.requests == [GOOGLE_TOKEN_URL, GOOGLE_JWKS_URL]
+    finally:
+        db.query(User).filter(User.google_id == google.callback_sub).delete()
+        db.commit()
+
+
+def test_unchanged_login_writes_no_row_version(db):
+    from sqlalchemy import text
+    from app.models.user import User
+    from app.services.auth_service import AuthService
+
+    google_id = "test-" + uuid.uuid4().hex[:12]
+    info = {"id": google_id, "email": f"{google_id}@example.com", "name": "Before", "picture": None}
+
+    def row_version():
+        return db.execute(text("SELECT xmin::text FROM users WHERE google_id = :g"), {"g": google_id}).scalar()
+
+    try:
+        created = AuthService.create_or_update_user(db, info)
+        version = row_version()
+        db.commit()
+
+        unchanged = AuthService.create_or_update_user(db, info)
+        assert unchanged.id == created.id
+        assert row_version() == version
+        db.commit()
+
+        renamed = AuthService.create_or_update_user(db, {**info, "name": "After"})
+        assert (renamed.id, renamed.name) == (created.id, "After")
+        assert row_version() != version
+    finally:
+        db.rollback()
+        db.query(User).filter(User.google_id == google_id).delete()
+        db.commit()
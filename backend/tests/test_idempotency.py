@@ -0,0 +1,27 @@
+"""Idempotency key claims, without the app or any backing services."""
+import asyncio
+from app.core.idempotency import IdempotencyStore
+
+
+class ContendedRedis:
+    """Redis where the key is always taken on SET and already gone on GET"""
+
+    def __init__(self):
+        self.sets = 0
+
+    async def set(self, key, value, nx=False, px=None):
+        self.sets += 1
+        return None
+
+    async def get(self, key):
+        return None
+
+
+def test_claim_that_keeps_losing_the_race_is_in_flight():
+    redis = ContendedRedis()
+    store = IdempotencyStore(redis, ttl_seconds=60, lock_seconds=60)
+    record = asyncio.run(store.claim("key", "fingerprint"))
+
+    assert redis.sets == 2
+    assert record == {"fingerprint": "fingerprint"}
+    assert IdempotencyStore.stored_response(record) is None
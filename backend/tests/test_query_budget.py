@@ -0,0 +1,134 @@
+"""Maximum SQL statements per request for the todo and auth routes.
+
+Budgets are the current query counts; a change that adds a query to a hot
+route fails here and has to raise the budget deliberately.
+"""
+import uuid
+import pytest
+
+# (auth mode, route prefix, budget spent on authentication)
+AUTH_MODES = [
+    ("session", "/api/v1/todos", 1),
+    ("personal", "/api/v1/personal-todos", 1),
+    ("oauth", "/api/v1/oauth-todos", 1),
+]
+
+
+@pytest.fixture(params=AUTH_MODES, ids=[mode for mode, _, _ in AUTH_MODES])
+def api(request, client, session_cookies, personal_headers, oauth_headers):
+    mode, prefix, auth_queries = request.param
+    credentials = {
+        "session": {"cookies": session_cookies},
+        "personal": {"headers": personal_headers},
+        "oauth": {"headers": oauth_headers},
+    }[mode]
+
+    def call(method, path="/", headers=None, **kwargs):
+        request_credentials = dict(credentials)
+        if headers:
+            request_credentials["headers"] = {**credentials.get("headers", {}), **headers}
+        return client.request(method, f"{prefix}{path}", **request_credentials, **kwargs)
+
+    call.auth_queries = auth_queries
+    return call
+
+
+@pytest.fixture
+def todo_id(api):
+    response = api("POST", json={"title": "Existing todo"})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_list_todos(api, todo_id, assert_max_queries):
+    with assert_max_queries(api.auth_queries + 1):
+        response = api("GET")
+    assert response.status_code == 200
+
+
+def test_create_todo(api, assert_max_queries):
+    with assert_max_queries(api.auth_queries + 2):
+        response = api("POST", json={"title": "New todo"})
+    assert response.status_code == 200
+
+
+def test_create_todo_replay(api, assert_max_queries):
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    first = api("POST", json={"title": "Once"}, headers=headers)
+    assert first.status_code == 200
+
+    with assert_max_queries(0):
+        replay = api("POST", json={"title": "Once"}, headers=headers)
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == first.json()
+
+    reused = api("POST", json={"title": "Different"}, headers=headers)
+    assert reused.status_code == 422
+
+
+def test_get_todo(api, todo_id, assert_max_queries):
+    with assert_max_queries(api.auth_queries + 1):
+        response = api("GET", f"/{todo_id}")
+    assert response.status_code == 200
+
+
+def test_update_todo(api, todo_id, assert_max_queries):
+    with assert_max_queries(api.auth_queries + 3):
+        response = api("PUT", f"/{todo_id}", json={"completed": True})
+    assert response.status_code == 200
+
+
+def test_delete_todo(api, todo_id, assert_max_queries):
+    with assert_max_queries(api.auth_queries + 2):
+        response = api("DELETE", f"/{todo_id}")
+    assert response.status_code == 200
+
+
+def test_current_user(client, session_cookies, assert_max_queries):
+    with assert_max_queries(1):
+        response = client.get("/api/v1/auth/me", cookies=session_cookies)
+    assert response.status_code == 200
+
+
+def test_logout(client, assert_max_queries):
+    with assert_max_queries(0):
+        response = client.post("/api/v1/auth/logout")
+    assert response.status_code == 200
+
+
+def test_token_stats(client, session_cookies, assert_max_queries):
+    with assert_max_queries(2):
+        response = client.get("/api/v1/personal-tokens/tokens/stats", cookies=session_cookies)
+    assert response.status_code == 200
+
+
+def test_token_usage_is_flushed(client, db, session_cookies, personal_headers):
+    from app.services.personal_token_service import PersonalTokenService
+
+    for _ in range(3):
+        assert client.get("/api/v1/todos/", headers=personal_headers).status_code == 200
+    assert PersonalTokenService.flush_usage(db) >= 1
+
+    stats = client.get("/api/v1/personal-tokens/tokens/stats", cookies=session_cookies).json()
+    assert (stats["total_requests"], stats["recently_used"]) == (3, 1)
+
+
+@pytest.mark.parametrize("mode", ["personal", "oauth"])
+def test_token_on_todos_prefix(mode, client, personal_headers, oauth_headers, assert_max_queries):
+    headers = {"personal": personal_headers, "oauth": oauth_headers}[mode]
+    auth_queries = {m: q for m, _, q in AUTH_MODES}[mode]
+    with assert_max_queries(auth_queries + 1):
+        response = client.get("/api/v1/todos/", headers=headers)
+    assert response.status_code == 200
+
+
+def test_unrecognised_bearer_costs_no_query(client, assert_max_queries):
+    with assert_max_queries(0):
+        response = client.get("/api/v1/todos/", headers={"Authorization": "Bearer not-a-yata-token"})
+    assert response.status_code == 401
+
+
+def test_empty_field_selection_is_rejected(client, session_cookies):
+    response = client.get("/api/v1/todos/", params={"fields": ","}, cookies=session_cookies)
+    assert response.status_code == 400
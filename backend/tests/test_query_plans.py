@@ -0,0 +1,210 @@
+"""Query-plan regression checks for the hot queries.
+
+Each test runs the real service code, captures the SQL it emits and checks
+`EXPLAIN (FORMAT JSON)` of every statement: the expected index is used, the
+large tables are never sequentially scanned and row estimates stay bounded.
+
+Needs a seeded database, e.g.::
+
+    python -m perf.seed --users 2000 --todos 500000 --truncate
+
+and is skipped when the todos table has fewer than MIN_TODOS rows.
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+MIN_TODOS = 100_000
+NO_SEQ_SCAN_TABLES = {"todos", "personal_tokens", "oauth_tokens"}
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    from app.core.database import engine as app_engine
+
+    try:
+        with app_engine.connect() as conn:
+            todos = conn.execute(text("SELECT count(*) FROM todos")).scalar()
+    except Exception as exc:
+        pytest.skip(f"Postgres not available: {exc}")
+    if todos < MIN_TODOS:
+        pytest.skip(f"Database not seeded ({todos} todos), run perf.seed first")
+    return app_engine
+
+
+@pytest.fixture
+def db(engine):
+    """Session whose commits become savepoints of a rolled-back transaction"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@contextmanager
+def capture_statements(engine) -> Iterator[List[Tuple[str, Any]]]:
+    statements: List[Tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def explain(db: Session, statement: str, parameters: Any) -> Dict[str, Any]:
+    cursor = db.connection().connection.cursor()
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    result = cursor.fetchone()[0]
+    plan = result if isinstance(result, list) else json.loads(result)
+    return plan[0]["Plan"]
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check_plans(
+    db: Session,
+    statements: List[Tuple[str, Any]],
+    table: str,
+    index: Optional[str],
+    max_rows: int
+) -> None:
+    """Check every statement touching `table`; at least one must use `index` if given"""
+    index_used = False
+    touched = False
+    for statement, parameters in statements:
+        plan = explain(db, statement, parameters)
+        nodes = list(plan_nodes(plan))
+
+        for node in nodes:
+            assert not (
+                node["Node Type"] == "Seq Scan" and node.get("Relation Name") in NO_SEQ_SCAN_TABLES
+            ), f"Seq Scan on {node['Relation Name']}:\n{statement}"
+
+        if not any(node.get("Relation Name") == table for node in nodes):
+            continue
+        touched = True
+        index_used = index_used or any(
+            node["Node Type"] in INDEX_NODES and node.get("Index Name") == index for node in nodes
+        )
+        assert plan["Plan Rows"] <= max_rows, (
+            f"Estimated {plan['Plan Rows']} rows, bound is {max_rows}:\n{statement}"
+        )
+
+    assert touched, f"No statement touched {table}"
+    assert index is None or index_used, f"{index} not used by:\n" + "\n".join(s for s, _ in statements)
+
+
+@pytest.fixture(scope="module")
+def typical_user_id(engine):
+    """A user with a median number of todos"""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT t.user_id, count(*) AS n FROM todos t "
+            "WHERE t.user_id IN (SELECT id FROM users ORDER BY id LIMIT 51) "
+            "GROUP BY t.user_id ORDER BY n"
+        )).all()
+    if not rows:
+        pytest.skip("No users with todos")
+    return rows[len(rows) // 2].user_id, rows[len(rows) // 2].n
+
+
+def test_todo_list(engine, db, typical_user_id):
+    from app.models.user import User
+    from app.services.todo_service import TodoService
+
+    user_id, todo_count = typical_user_id
+    user = db.get(User, user_id)
+    with capture_statements(engine) as statements:
+        TodoService.list_todos(db, user)
+    check_plans(db, statements, "todos", "ix_todos_user_id", max(todo_count * 10, 1000))
+
+
+def test_todo_lookup(engine, db, typical_user_id):
+    from app.models.todo import Todo
+    from app.models.user import User
+    from app.services.todo_service import TodoService
+
+    user = db.get(User, typical_user_id[0])
+    todo_id = db.query(Todo.id).filter(Todo.user_id == user.id).limit(1).scalar()
+    with capture_statements(engine) as statements:
+        TodoService.get_todo_row(db, todo_id, user)
+    check_plans(db, statements, "todos", "todos_pkey", 1)
+
+
+def test_personal_token_validation(engine, db):
+    from app.services.personal_token_service import PersonalTokenService
+    from perf.seed import seed_personal_token
+
+    with capture_statements(engine) as statements:
+        PersonalTokenService.validate_token(db, seed_personal_token(0, 0))
+    check_plans(db, statements, "personal_tokens", "ix_personal_tokens_token_hash", 1)
+
+
+def test_oauth_token_validation(engine, db):
+    from app.models.oauth_token import OAuthToken
+    from app.services.oauth_service import OAuthService
+
+    access_token = db.query(OAuthToken.access_token).filter(OAuthToken.is_active == True).limit(1).scalar()
+    with capture_statements(engine) as statements:
+        OAuthService.validate_token(db, access_token)
+    check_plans(db, statements, "oauth_tokens", "ix_oauth_tokens_access_token", 1)
+
+
+def test_oauth_token_reuse_lookup(engine, db):
+    from app.models.oauth_client import OAuthClient
+    from app.services.oauth_service import OAuthService
+
+    client = db.query(OAuthClient).filter(OAuthClient.is_active == True).first()
+    with capture_statements(engine) as statements:
+        OAuthService.generate_token(db, client, ["todos:read", "todos:write"])
+    check_plans(db, statements, "oauth_tokens", "ix_oauth_tokens_client_active", 10)
+
+
+def test_oauth_client_lookup(engine, db):
+    from app.models.oauth_client import OAuthClient
+    from app.services.oauth_service import OAuthService
+
+    client = db.query(OAuthClient).filter(OAuthClient.is_active == True).first()
+    with capture_statements(engine) as statements:
+        OAuthService.authenticate_client(db, client.client_id, client.client_secret)
+    # A few hundred clients fit in a page or two, so the planner may rightly
+    # prefer a Seq Scan; only the estimate is bounded
+    check_plans(db, statements, "oauth_clients", None, 1)
+
+
+def test_current_user_lookup(engine, db, typical_user_id):
+    from app.api.deps import get_current_user
+    from app.core.security import session_manager
+    from app.models.user import User
+
+    user = db.get(User, typical_user_id[0])
+    try:
+        session_id = session_manager.create_session({"id": user.id, "email": user.email, "name": user.name})
+    except Exception as exc:
+        pytest.skip(f"Redis not available: {exc}")
+    db.expunge_all()
+    try:
+        with capture_statements(engine) as statements:
+            asyncio.run(get_current_user(session_id, db))
+    finally:
+        session_manager.delete_session(session_id)
+    check_plans(db, statements, "users", "users_pkey", 1)
@@ -0,0 +1,65 @@
+"""Rate limit keying against the app with local Postgres and Redis."""
+import secrets
+import pytest
+
+BACKSTOP_KEYS = "ratelimit:*:ip:testclient"
+
+
+@pytest.fixture
+def clean_buckets(app):
+    from app.core.security import redis_client
+
+    def clear():
+        for key in redis_client.scan_iter(BACKSTOP_KEYS):
+            redis_client.delete(key)
+
+    clear()
+    yield
+    clear()
+
+
+@pytest.fixture
+def oauth_client(db, user):
+    from app.models.oauth_client import OAuthClient
+    from app.models.oauth_token import OAuthToken
+    from app.services.oauth_service import OAuthService
+
+    client = OAuthService.create_client(db, "test", ["todos:read", "todos:write"], user)
+    db.commit()
+    yield client
+
+    db.rollback()
+    db.query(OAuthToken).filter(OAuthToken.client_id == client.client_id).delete()
+    db.query(OAuthClient).filter(OAuthClient.client_id == client.client_id).delete()
+    db.commit()
+
+
+def remaining(response) -> int:
+    return int(response.headers["X-RateLimit-Remaining"])
+
+
+def test_oauth_tokens_of_one_client_share_a_bucket(client, db, oauth_client):
+    from app.services.oauth_service import OAuthService
+
+    tokens = [
+        OAuthService.generate_token(db, oauth_client, scopes).access_token
+        for scopes in (["todos:read"], ["todos:read", "todos:write"])
+    ]
+    db.commit()
+    assert tokens[0] != tokens[1]
+
+    first = client.get("/api/v1/todos/", headers={"Authorization": f"Bearer {tokens[0]}"})
+    second = client.get("/api/v1/todos/", headers={"Authorization": f"Bearer {tokens[1]}"})
+    assert first.status_code == second.status_code == 200
+    assert remaining(second) == remaining(first) - 1
+
+
+def test_rotating_made_up_tokens_hits_the_ip_backstop(client, clean_buckets):
+    from app.core.config import settings
+
+    statuses = [
+        client.get("/api/v1/todos/", headers={"Authorization": f"Bearer {secrets.token_urlsafe(64)}"}).status_code
+        for _ in range(settings.rate_limit_auth_failure_burst + 1)
+    ]
+    assert statuses[:-1] == [401] * settings.rate_limit_auth_failure_burst
+    assert statuses[-1] == 429
@@ -0,0 +1,26 @@
+"""Todo response bytes, without the app or any backing services."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List
+from pydantic import TypeAdapter
+from app.api.responses import ORJSONResponse
+from app.schemas.todo import TodoResponse, serialize_todos
+
+
+def test_orjson_todos_match_pydantic_bytes():
+    rows = [
+        SimpleNamespace(
+            id="a", user_id="u", title="fractional", description=None, completed=False,
+            created_at=datetime(2026, 1, 1, 5, 6, 7, 123, tzinfo=timezone.utc),
+            updated_at=datetime(2026, 1, 2, 5, 6, 7, tzinfo=timezone.utc),
+        ),
+        SimpleNamespace(
+            id="b", user_id="u", title="whole second", description="d", completed=True,
+            created_at=datetime(2026, 1, 1, 5, 6, 7, tzinfo=timezone.utc), updated_at=None,
+        ),
+    ]
+    adapter = TypeAdapter(List[TodoResponse])
+    expected = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    assert ORJSONResponse(serialize_todos(rows)).body == expected
+    assert b'"2026-01-01T05:06:07.000123Z"' in expected
@@ -0,0 +1,63 @@
+"""Single-flight read coalescing, without the app or any backing services."""
+import asyncio
+from app.core.single_flight import SingleFlightMiddleware
+
+TOKEN = b"Bearer " + b"t" * 86
+
+
+class CountingApp:
+    """Answer every request with its method and a per-app call number"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = f"{scope['method']} {self.calls}".encode()
+        if scope["method"] == "GET":
+            await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+
+async def request(middleware, method):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/api/v1/todos/",
+        "query_string": b"",
+        "headers": [(b"authorization", TOKEN)],
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message["body"])
+
+    await middleware(scope, receive, send)
+    return b"".join(body)
+
+
+def test_read_after_write_does_not_join_older_flight():
+    async def scenario():
+        app = CountingApp()
+        middleware = SingleFlightMiddleware(app)
+        leader = asyncio.create_task(request(middleware, "GET"))
+        follower = asyncio.create_task(request(middleware, "GET"))
+        await asyncio.sleep(0)
+
+        assert await request(middleware, "POST") == b"POST 2"
+        fresh = asyncio.create_task(request(middleware, "GET"))
+        await asyncio.sleep(0)
+        app.release.set()
+
+        assert await leader == b"GET 1"
+        assert await follower == b"GET 1"
+        assert await fresh == b"GET 3"
+        assert app.calls == 3
+
+    asyncio.run(scenario())
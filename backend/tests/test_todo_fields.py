@@ -0,0 +1,35 @@
+"""Sparse fieldset parsing for `?fields=` on the todo routes."""
+from types import SimpleNamespace
+import pytest
+from app.schemas.todo import TODO_RESPONSE_FIELDS, SparseTodoResponse, parse_todo_fields, serialize_todos
+
+
+def test_missing_or_empty_value_selects_every_field():
+    assert parse_todo_fields(None) == TODO_RESPONSE_FIELDS
+    assert parse_todo_fields("") == TODO_RESPONSE_FIELDS
+
+
+def test_selection_is_in_schema_order():
+    assert parse_todo_fields(" title,id ,title") == ("title", "id")
+
+
+@pytest.mark.parametrize("value", [",", " , ,", "   ", "unknown", "id,secret"])
+def test_invalid_selection_is_rejected(value):
+    with pytest.raises(ValueError):
+        parse_todo_fields(value)
+
+
+def test_sparse_schema_covers_every_field_and_requires_none():
+    schema = SparseTodoResponse.model_json_schema()
+    assert tuple(schema["properties"]) == TODO_RESPONSE_FIELDS
+    assert "required" not in schema
+
+
+def test_validated_sparse_rows_keep_only_selected_fields():
+    rows = [SimpleNamespace(id="a", title="first"), SimpleNamespace(id="b", title="second")]
+    fields = parse_todo_fields("id,title")
+    assert serialize_todos(rows, validate=True, fields=fields) == [
+        {"title": "first", "id": "a"},
+        {"title": "second", "id": "b"},
+    ]
+    assert serialize_todos(rows, fields=fields) == serialize_todos(rows, validate=True, fields=fields)
@@ -0,0 +1,55 @@
+"""Trace sampling and span export, without the app or any backing services."""
+import asyncio
+import json
+from app.core import tracing
+from app.core.config import settings
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+def run_request(headers):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    asyncio.run(tracing.TracingMiddleware(app)(scope, receive, send))
+
+
+def test_upstream_sampled_flag_needs_trust(monkeypatch):
+    exporter = tracing.InMemorySpanExporter()
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    monkeypatch.setattr(settings, "tracing_sample_ratio", 0.0)
+    headers = [(b"traceparent", TRACEPARENT.encode())]
+
+    run_request(headers)
+    assert list(exporter.spans) == []
+
+    monkeypatch.setattr(settings, "tracing_trust_upstream", True)
+    run_request(headers)
+    (root,) = exporter.spans
+    assert root.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert root.parent_id == "00f067aa0ba902b7"
+
+
+def test_file_exporter_rotates(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = tracing.FileSpanExporter(str(path), max_bytes=1000, backups=2)
+    for index in range(30):
+        span = tracing.Span(f"span-{index}", "0" * 31 + "1")
+        span.end_ns = span.start_ns
+        exporter.export(span)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "traces.jsonl", "traces.jsonl.1", "traces.jsonl.2",
+    ]
+    for file in tmp_path.iterdir():
+        assert file.stat().st_size <= 1000
+    last = path.read_text().splitlines()[-1]
+    assert json.loads(last)["name"] == "span-29"
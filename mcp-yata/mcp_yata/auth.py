@@ -2,6 +2,7 @@ import time
 import httpx
 from typing import Optional
 from .config import settings
+from .tracing import span, inject_headers
 
 
 class OAuthClient:
@@ -21,14 +22,15 @@ class OAuthClient:
             return self._token["access_token"]
         
         # Fetch new token with JSON body
-        with httpx.Client() as client:
+        with span("OAuthClient.get_access_token"), httpx.Client() as client:
             response = client.post(
                 self.token_url,
                 auth=(self.client_id, self.client_secret),
                 json={
                     "grant_type": "client_credentials",
                     "scope": "todos:read todos:write"
-                }
+                },
+                headers=inject_headers({})
             )
             response.raise_for_status()
             token = response.json()
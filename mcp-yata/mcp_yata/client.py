@@ -3,6 +3,8 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from .auth import oauth_client
 from .config import settings
+from .retry import idempotency_headers, request_with_retries
+from .tracing import span, inject_headers
 
 
 class TodoCreate(BaseModel):
@@ -29,57 +31,41 @@ class YataAPIClient:
             "Content-Type": "application/json"
         }
     
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        """Send an authenticated API request as a traced span, retrying transient failures"""
+        headers = self._get_headers()
+        headers.update(idempotency_headers(method))
+        with span(f"{method} {self.base_url}{path}"):
+            async with httpx.AsyncClient() as client:
+                response = await request_with_retries(
+                    client,
+                    method,
+                    f"{self.base_url}{path}",
+                    headers=inject_headers(headers),
+                    **kwargs
+                )
+                response.raise_for_status()
+                return response.json()
+    
     async def create_todo(self, todo: TodoCreate) -> Dict[str, Any]:
         """Create a new todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/",
-                json=todo.dict(),
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("POST", "/", json=todo.dict())
     
-    async def list_todos(self) -> List[Dict[str, Any]]:
-        """Get all todos"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+    async def list_todos(self, fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all todos, optionally only the comma-separated `fields`"""
+        return await self._request("GET", "/", params={"fields": fields} if fields else None)
     
     async def get_todo(self, todo_id: str) -> Dict[str, Any]:
         """Get a specific todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/{todo_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("GET", f"/{todo_id}")
     
     async def update_todo(self, todo_id: str, todo: TodoUpdate) -> Dict[str, Any]:
         """Update a todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/{todo_id}",
-                json=todo.dict(exclude_unset=True),
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("PUT", f"/{todo_id}", json=todo.dict(exclude_unset=True))
     
     async def delete_todo(self, todo_id: str) -> Dict[str, Any]:
         """Delete a todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.base_url}/{todo_id}",
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("DELETE", f"/{todo_id}")
 
 
 yata_client = YataAPIClient()
\ No newline at end of file
@@ -13,6 +13,9 @@ class Settings(BaseSettings):
     
     # API settings
     api_base_url: str = "http://backend:8000/api/v1/oauth-todos"
+    request_retries: int = 3
+    retry_backoff_seconds: float = 0.25
+    retry_max_delay_seconds: float = 5.0
     
     # MCP settings
     server_name: str = "mcp-yata"
@@ -21,6 +24,10 @@ class Settings(BaseSettings):
     # Auth mode: "oauth" or "personal"
     auth_mode: str = "oauth"
     
+    # Tracing settings
+    trace_sample_ratio: float = 0.0
+    trace_file: Optional[str] = None
+    
     class Config:
         env_file = ".env"
 
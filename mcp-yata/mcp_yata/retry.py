@@ -0,0 +1,56 @@
+"""Retries for API requests.
+
+Mutating requests carry an `Idempotency-Key` that stays the same across
+attempts, so the backend replays the first response instead of creating a
+duplicate when a retry follows a lost reply.
+"""
+import asyncio
+import random
+import uuid
+from typing import Dict, Optional
+import httpx
+from .config import settings
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# 409: an earlier attempt with the same key is still running
+RETRY_STATUSES = {409, 429, 502, 503, 504}
+
+
+def idempotency_headers(method: str) -> Dict[str, str]:
+    """A fresh Idempotency-Key for a mutating request, reused by its retries"""
+    if method.upper() in MUTATING_METHODS:
+        return {"Idempotency-Key": str(uuid.uuid4())}
+    return {}
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.retry_max_delay_seconds)
+    # Full jitter exponential backoff
+    return random.uniform(0, min(settings.retry_max_delay_seconds, settings.retry_backoff_seconds * 2 ** attempt))
+
+
+async def request_with_retries(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    **kwargs
+) -> httpx.Response:
+    """Send a request, retrying connection errors and transient statuses"""
+    for attempt in range(settings.request_retries + 1):
+        last_attempt = attempt == settings.request_retries
+        try:
+            response = await client.request(method, url, headers=headers, **kwargs)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            await asyncio.sleep(_retry_delay(attempt, None))
+            continue
+        if response.status_code == 409 and "Idempotency-Key" not in headers:
+            return response
+        if response.status_code not in RETRY_STATUSES or last_attempt:
+            return response
+        await asyncio.sleep(_retry_delay(attempt, response))
@@ -2,6 +2,8 @@ import time
 import httpx
 from typing import Optional
 from .config import settings
+from .retry import idempotency_headers, request_with_retries
+from .tracing import span, inject_headers
 
 
 class SimpleAuthClient:
@@ -21,57 +23,41 @@ class SimpleAuthClient:
             "Content-Type": "application/json"
         }
     
+    async def _request(self, method: str, path: str, **kwargs):
+        """Send an authenticated API request as a traced span, retrying transient failures"""
+        headers = self.get_headers()
+        headers.update(idempotency_headers(method))
+        with span(f"{method} {self.api_base_url}{path}"):
+            async with httpx.AsyncClient() as client:
+                response = await request_with_retries(
+                    client,
+                    method,
+                    f"{self.api_base_url}{path}",
+                    headers=inject_headers(headers),
+                    **kwargs
+                )
+                response.raise_for_status()
+                return response.json()
+    
     async def create_todo(self, todo_data: dict) -> dict:
         """Create a new todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_base_url}/",
-                json=todo_data,
-                headers=self.get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("POST", "/", json=todo_data)
     
-    async def list_todos(self) -> list:
-        """Get all todos"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_base_url}/",
-                headers=self.get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+    async def list_todos(self, fields: Optional[str] = None) -> list:
+        """Get all todos, optionally only the comma-separated `fields`"""
+        return await self._request("GET", "/", params={"fields": fields} if fields else None)
     
     async def get_todo(self, todo_id: str) -> dict:
         """Get a specific todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_base_url}/{todo_id}",
-                headers=self.get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("GET", f"/{todo_id}")
     
     async def update_todo(self, todo_id: str, todo_data: dict) -> dict:
         """Update a todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.api_base_url}/{todo_id}",
-                json=todo_data,
-                headers=self.get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("PUT", f"/{todo_id}", json=todo_data)
     
     async def delete_todo(self, todo_id: str) -> dict:
         """Delete a todo"""
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.api_base_url}/{todo_id}",
-                headers=self.get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._request("DELETE", f"/{todo_id}")
 
 
 simple_client = SimpleAuthClient()
\ No newline at end of file
@@ -10,6 +10,7 @@ from mcp.types import (
     LoggingLevel
 )
 from .simple_auth import simple_client
+from .tracing import span
 from .config import settings
 
 
@@ -111,6 +112,10 @@ def setup_todo_tools(server: Server):
     @server.call_tool()
     async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         """Handle tool calls"""
+        with span(f"tool {name}"):
+            return await _call_tool(name, arguments)
+    
+    async def _call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         try:
             if name == "create_todo":
                 todo_data = {
@@ -125,7 +130,8 @@ def setup_todo_tools(server: Server):
                 )]
             
             elif name == "list_todos":
-                todos = await simple_client.list_todos()
+                # The listing only shows these, so skip downloading descriptions
+                todos = await simple_client.list_todos(fields="id,title,completed")
                 if not todos:
                     return [TextContent(type="text", text="No todos found")]
                 
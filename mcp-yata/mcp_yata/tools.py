@@ -10,6 +10,7 @@ from mcp.types import (
     LoggingLevel
 )
 from .client import yata_client, TodoCreate, TodoUpdate
+from .tracing import span
 
 
 def setup_todo_tools(server: Server):
@@ -110,6 +111,10 @@ def setup_todo_tools(server: Server):
     @server.call_tool()
     async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         """Handle tool calls"""
+        with span(f"tool {name}"):
+            return await _call_tool(name, arguments)
+    
+    async def _call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         try:
             if name == "create_todo":
                 todo = TodoCreate(
@@ -124,7 +129,8 @@ def setup_todo_tools(server: Server):
                 )]
             
             elif name == "list_todos":
-                todos = await yata_client.list_todos()
+                # The listing only shows these, so skip downloading descriptions
+                todos = await yata_client.list_todos(fields="id,title,completed")
                 if not todos:
                     return [TextContent(type="text", text="No todos found")]
                 
@@ -0,0 +1,85 @@
+"""Minimal W3C trace-context propagation for tool calls.
+
+Each tool call opens a root span; token fetches and API requests become
+child spans and send a `traceparent` header so the backend continues the
+same trace. Spans are appended as JSON lines to TRACE_FILE when set.
+"""
+import json
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+from .config import settings
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.attributes: Dict[str, object] = {}
+
+    @property
+    def traceparent(self) -> str:
+        flags = "01" if self.sampled else "00"
+        return f"00-{self.trace_id}-{self.span_id}-{flags}"
+
+    def end(self, status: str = "ok") -> None:
+        if not self.sampled or not settings.trace_file:
+            return
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": (time.time_ns() - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "status": status,
+            "service": settings.server_name,
+        }
+        with open(settings.trace_file, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Record a span, starting a new trace when there is no current span"""
+    parent = _current_span.get()
+    if parent is None:
+        current = Span(
+            name,
+            secrets.token_hex(16),
+            None,
+            random.random() < settings.trace_sample_ratio
+        )
+    else:
+        current = Span(name, parent.trace_id, parent.span_id, parent.sampled)
+    current.attributes.update(attributes)
+
+    token = _current_span.set(current)
+    status = "ok"
+    try:
+        yield current
+    except BaseException as exc:
+        status = f"error: {type(exc).__name__}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end(status)
+
+
+def inject_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add the current span's traceparent to outgoing request headers"""
+    current = _current_span.get()
+    if current is not None:
+        headers["traceparent"] = current.traceparent
+    return headers
@@ -13,6 +13,15 @@ import sys
 import requests
 from pathlib import Path
 
+def registration_headers():
+    """Clients act for the user whose personal access token registers them"""
+    token = os.environ.get("YATA_PERSONAL_TOKEN")
+    if not token:
+        print("Set YATA_PERSONAL_TOKEN to a personal access token created in the Yata web app;")
+        print("the OAuth client will act for that token's user.")
+        sys.exit(1)
+    return {"Authorization": f"Bearer {token}"}
+
 def get_claude_config_path():
     """Get Claude Desktop config path based on OS"""
     home = Path.home()
@@ -60,7 +69,8 @@ def create_or_get_oauth_client(base_url="http://localhost:8000"):
             params={
                 "client_name": client_name,
                 "scopes": scopes
-            }
+            },
+            headers=registration_headers()
         )
         
         if response.status_code == 200:
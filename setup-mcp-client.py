@@ -4,10 +4,20 @@ Setup script to create an OAuth client for the MCP server.
 Run this script after starting the backend to generate client credentials.
 """
 
+import os
 import requests
 import json
 import sys
 
+def registration_headers():
+    """Clients act for the user whose personal access token registers them"""
+    token = os.environ.get("YATA_PERSONAL_TOKEN")
+    if not token:
+        print("Set YATA_PERSONAL_TOKEN to a personal access token created in the Yata web app;")
+        print("the OAuth client will act for that token's user.")
+        sys.exit(1)
+    return {"Authorization": f"Bearer {token}"}
+
 def create_oauth_client(base_url="http://localhost:8000"):
     """Create an OAuth client for the MCP server"""
     
@@ -25,7 +35,8 @@ def create_oauth_client(base_url="http://localhost:8000"):
             params={
                 "client_name": client_name,
                 "scopes": scopes
-            }
+            },
+            headers=registration_headers()
         )
         
         if response.status_code == 200: